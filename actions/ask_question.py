@@ -5,6 +5,7 @@ from rasa_sdk.events import SlotSet
 from rasa_sdk.executor import CollectingDispatcher
 
 from utils.content_loader import load_questions, load_question_config
+from utils.score_codec import skipped_items
 
 
 class ActionAskQuestion(Action):
@@ -24,9 +25,11 @@ class ActionAskQuestion(Action):
             lang = "en"
         user_role = (tracker.get_slot("user_role") or "").strip()
         user_setting = (tracker.get_slot("user_setting") or "").strip()
+        skipped = set(skipped_items(tracker.get_slot("item_scores")))
 
         def previous_question_id(qid: Text) -> Text:
-            ordered = list(load_question_config()["questions"].keys())
+            # Items skipped by adaptive mode were never asked, so look past them.
+            ordered = [q for q in load_question_config()["questions"].keys() if q not in skipped]
             try:
                 idx = ordered.index(qid)
             except ValueError:
@@ -39,27 +42,24 @@ class ActionAskQuestion(Action):
             prev_qid = previous_question_id(question_id)
             if not prev_qid or count > 0:
                 return ""
-            prev_text = (tracker.get_slot(f"{prev_qid}_text") or "").lower().strip()
-            if not prev_text:
+            # The raw answer is cleared once scored; ActionParseScore keeps its tone.
+            tone = tracker.get_slot("last_answer_tone") or ""
+            if not tone:
                 return ""
 
-            stress_markers = {"stressed", "overwhelmed", "anxious", "panic", "stress", "estres", "ansioso", "abrumado"}
-            low_markers = {"no", "nope", "not really", "none", "never", "not that much", "nada", "nunca", "no mucho", "para nada"}
-            high_markers = {"very", "a lot", "often", "constantly", "mucho", "muy", "bastante", "siempre"}
-
-            if any(m in prev_text for m in stress_markers):
+            if tone == "stress":
                 return (
                     "That sounds really heavy."
                     if lang == "en"
                     else "Eso suena realmente pesado."
                 )
-            if any(m in prev_text for m in high_markers):
+            if tone == "high":
                 return (
                     "That sounds intense."
                     if lang == "en"
                     else "Eso suena intenso."
                 )
-            if any(m in prev_text for m in low_markers):
+            if tone == "low":
                 return (
                     "Got it."
                     if lang == "en"
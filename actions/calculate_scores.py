@@ -5,6 +5,7 @@ from rasa_sdk.events import SlotSet
 from rasa_sdk.executor import CollectingDispatcher
 
 from utils.scoring import calculate_domain_score, get_top_domains
+from utils.score_codec import domain_scores
 
 
 class ActionCalculateScores(Action):
@@ -17,15 +18,10 @@ class ActionCalculateScores(Action):
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[Dict[Text, Any]]:
-        intrusion_score = calculate_domain_score([
-            tracker.get_slot(f"intrusion_{i}") or 0 for i in range(1, 6)
-        ])
-        avoidance_score = calculate_domain_score([
-            tracker.get_slot(f"avoidance_{i}") or 0 for i in range(1, 3)
-        ])
-        hyperarousal_score = calculate_domain_score([
-            tracker.get_slot(f"hyperarousal_{i}") or 0 for i in range(1, 7)
-        ])
+        packed = tracker.get_slot("item_scores")
+        intrusion_score = calculate_domain_score(domain_scores(packed, "intrusion"))
+        avoidance_score = calculate_domain_score(domain_scores(packed, "avoidance"))
+        hyperarousal_score = calculate_domain_score(domain_scores(packed, "hyperarousal"))
         scores = {
             "Intrusion": intrusion_score,
             "Avoidance": avoidance_score,
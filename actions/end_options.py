@@ -4,6 +4,8 @@ from rasa_sdk import Action, Tracker
 from rasa_sdk.events import Restarted, SlotSet
 from rasa_sdk.executor import CollectingDispatcher
 
+from utils.summary import render_summary
+
 
 class ActionAskEndOptions(Action):
     def name(self) -> Text:
@@ -41,7 +43,8 @@ class ActionHandleEndChoice(Action):
         choice = (tracker.get_slot("end_choice") or "").strip().lower()
 
         if choice in {"summary", "resumen"}:
-            summary = tracker.get_slot("last_summary_text") or ""
+            # Re-render from the packed scores rather than keeping the text in the tracker.
+            summary = render_summary(tracker) if tracker.get_slot("top_domains") else ""
             if summary:
                 dispatcher.utter_message(text=summary)
             if lang == "es":
@@ -38,37 +38,43 @@ SPANISH_MARKERS = {
 }
 
 
-def _detect_role(text: str) -> str:
+def _compile_keywords(table: Dict[str, List[str]]) -> Dict[str, list]:
+    """Single tokens get a word-boundary regex (compiled once, here); phrases use direct contains."""
+    return {
+        label: [k if " " in k else re.compile(rf"\b{re.escape(k)}\b") for k in keys]
+        for label, keys in table.items()
+    }
+
+
+_ROLE_PATTERNS = _compile_keywords(ROLE_KEYWORDS)
+_SETTING_PATTERNS = _compile_keywords(SETTING_KEYWORDS)
+_YEARS_PATTERN = re.compile(r"(\d{1,2})\s*(?:\+?\s*)?(?:years?|yrs?|años?)")
+
+
+def _first_label(text: str, patterns: Dict[str, list]) -> str:
     low = (text or "").lower()
-    for role, keys in ROLE_KEYWORDS.items():
+    for label, keys in patterns.items():
         for k in keys:
-            # Single tokens use word boundaries; phrases use direct contains.
-            if " " in k:
+            if isinstance(k, str):
                 if k in low:
-                    return role
-            else:
-                if re.search(rf"\b{re.escape(k)}\b", low):
-                    return role
+                    return label
+            elif k.search(low):
+                return label
     return ""
 
 
+def _detect_role(text: str) -> str:
+    return _first_label(text, _ROLE_PATTERNS)
+
+
 def _detect_setting(text: str) -> str:
-    low = (text or "").lower()
-    for setting, keys in SETTING_KEYWORDS.items():
-        for k in keys:
-            if " " in k:
-                if k in low:
-                    return setting
-            else:
-                if re.search(rf"\b{re.escape(k)}\b", low):
-                    return setting
-    return ""
+    return _first_label(text, _SETTING_PATTERNS)
 
 
 def _detect_years(text: str) -> str:
     if not text:
         return ""
-    m = re.search(r"(\d{1,2})\s*(?:\+?\s*)?(?:years?|yrs?|años?)", text.lower())
+    m = _YEARS_PATTERN.search(text.lower())
     if m:
         return m.group(1)
     return ""
@@ -4,8 +4,46 @@ from rasa_sdk import Action, Tracker
 from rasa_sdk.events import SlotSet, FollowupAction
 from rasa_sdk.executor import CollectingDispatcher
 
-from utils.scoring import needs_followup, parse_score, is_uncertain
-from utils.content_loader import load_question_config, load_questions
+from utils.scoring import answer_tone, needs_followup, is_uncertain, score_answer
+from utils.content_loader import load_message, load_question_config, load_questions
+from utils.safety import screen
+from utils.score_codec import mark_skipped, set_score, skipped_items, unpack_scores
+from utils import adaptive
+
+
+def _adaptive_skip_events(tracker: Tracker, skip: bool) -> List[Dict[Text, Any]]:
+    """Set `adaptive_skip` only while adaptive mode is on or a skip is still pending."""
+    if not (adaptive.is_enabled() or tracker.get_slot("adaptive_skip")):
+        return []
+    return [SlotSet("adaptive_skip", skip)]
+
+
+def _changed_events(tracker: Tracker, **slots: Any) -> List[Dict[Text, Any]]:
+    """SlotSets for the slots whose value changes; a repeated value only grows the event log."""
+    return [SlotSet(name, value) for name, value in slots.items() if tracker.get_slot(name) != value]
+
+
+def _scored_events(
+    tracker: Tracker,
+    question_id: Text,
+    text_slot: Text,
+    text: Text,
+    score: float,
+    rephrase_count: int,
+) -> List[Dict[Text, Any]]:
+    """Pack the item score, drop the raw answer and apply adaptive skipping."""
+    packed = set_score(tracker.get_slot("item_scores"), question_id, score)
+    to_skip = []
+    if adaptive.is_enabled():
+        # Skip the rest of the domain once it can no longer change the ordered top domains.
+        to_skip = adaptive.items_to_skip(question_id, unpack_scores(packed), skipped_items(packed))
+        if to_skip:
+            packed = mark_skipped(packed, to_skip)
+    return (
+        [SlotSet("item_scores", packed), SlotSet(text_slot, None)]
+        + _changed_events(tracker, rephrase_count=rephrase_count, last_answer_tone=answer_tone(text))
+        + _adaptive_skip_events(tracker, bool(to_skip))
+    )
 
 
 class ActionParseScore(Action):
@@ -27,6 +65,12 @@ class ActionParseScore(Action):
         count = tracker.get_slot("rephrase_count") or 0
         is_context_question = (current_question or "").startswith("context_")
 
+        # Screen every answer before scoring; support comes first, then the flow carries on.
+        safety_events = []
+        if text and screen(text):
+            dispatcher.utter_message(text=load_message("es" if lang == "es" else "en", "safety"))
+            safety_events = [SlotSet("safety_flag", True)]
+
         if text and is_uncertain(text) and not is_context_question:
             count += 1
             if count < max_rephrases:
@@ -40,11 +84,13 @@ class ActionParseScore(Action):
                     dispatcher.utter_message(text=rephrased)
                 except Exception:
                     pass
-                return [
-                    SlotSet(text_slot, None),
-                    SlotSet("rephrase_count", count),
-                    FollowupAction("action_listen"),
-                ]
+                # Clear a skip left over from the previous domain so the flow stays on this item.
+                return (
+                    safety_events
+                    + [SlotSet(text_slot, None), SlotSet("rephrase_count", count)]
+                    + _adaptive_skip_events(tracker, False)
+                    + [FollowupAction("action_listen")]
+                )
             else:
                 if lang == "es":
                     dispatcher.utter_message(
@@ -54,16 +100,22 @@ class ActionParseScore(Action):
                     dispatcher.utter_message(
                         text="That's okay if you don't want to go into this right now. We'll move to the next question."
                     )
-                return [SlotSet(current_question, 1), SlotSet("rephrase_count", 0)]
+                return safety_events + _scored_events(tracker, current_question, text_slot, text, 1, 0)
 
         if text and needs_followup(text) and count == 0 and not is_context_question:
             if lang == "es":
                 dispatcher.utter_message(text="Gracias. ¿Podrías contarme un poco más para entenderte mejor?")
             else:
                 dispatcher.utter_message(text="Thanks. Could you share a bit more so I can understand better?")
-            return [SlotSet(current_question, 1), SlotSet("rephrase_count", 1)]
+            return safety_events + _scored_events(tracker, current_question, text_slot, text, 1, 1)
 
-        score = parse_score(text or "", current_question or "")
+        score = score_answer(text or "", current_question or "")
         if is_context_question:
-            return [SlotSet("rephrase_count", 0)]
-        return [SlotSet(current_question, score), SlotSet("rephrase_count", 0)]
+            # Background is already extracted, so the raw answer is no longer needed.
+            return (
+                safety_events
+                + [SlotSet(text_slot, None)]
+                + _changed_events(tracker, rephrase_count=0, last_answer_tone=answer_tone(text or ""))
+                + _adaptive_skip_events(tracker, False)
+            )
+        return safety_events + _scored_events(tracker, current_question, text_slot, text or "", score, 0)
@@ -0,0 +1,50 @@
+import asyncio
+
+from utils.admission import AdmissionController
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_cancelled_waiter_does_not_keep_a_slot():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_budget_s=0.05, priority_budget_s=5.0)
+        assert await controller.acquire(priority=True)
+        waiter = asyncio.ensure_future(controller.acquire(priority=True))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        controller.release()
+        assert controller.in_flight == 0
+        assert controller.snapshot()["queue_depth"] == {"priority": 0, "new": 0}
+        assert await controller.acquire(priority=False)
+
+    _run(scenario())
+
+
+def test_cancelled_after_handoff_passes_the_slot_on():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_budget_s=1.0, priority_budget_s=5.0)
+        assert await controller.acquire(priority=True)
+        first = asyncio.ensure_future(controller.acquire(priority=True))
+        second = asyncio.ensure_future(controller.acquire(priority=True))
+        await asyncio.sleep(0)
+        controller.release()  # hands the slot to `first` ...
+        first.cancel()  # ... which is cancelled before it resumes
+        await asyncio.gather(first, return_exceptions=True)
+        assert await asyncio.wait_for(second, 1.0)
+        assert controller.in_flight == 1
+
+    _run(scenario())
+
+
+def test_priority_requests_are_shed_past_their_budget():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_budget_s=0.01, priority_budget_s=0.02)
+        assert await controller.acquire(priority=True)
+        assert not await controller.acquire(priority=True)
+        assert controller.snapshot()["shed"]["priority"] == 1
+        assert controller.snapshot()["queue_depth"]["priority"] == 0
+
+    _run(scenario())
@@ -0,0 +1,55 @@
+from utils.bounded_store import BoundedStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_evict_early_entries_go_before_least_recently_used():
+    store = BoundedStore(max_entries=2)
+    store.put("old", 1)
+    store.put("finished", 2, evict_early=True)
+    store.put("new", 3)
+    assert set(store.keys()) == {"old", "new"}
+    store.put("newer", 4)
+    assert set(store.keys()) == {"new", "newer"}
+    assert store.stats()["evicted_early"] == 1
+    assert store.stats()["evicted_lru"] == 1
+
+
+def test_max_bytes_evicts_least_recently_used():
+    store = BoundedStore(max_bytes=100)
+    store.put("a", "x", size=40)
+    store.put("b", "y", size=40)
+    assert store["a"] == "x"  # now "b" is the least recently used
+    store.put("c", "z", size=40)
+    assert set(store.keys()) == {"a", "c"}
+    assert store.bytes == 80
+
+
+def test_ttl_expiry_counts_one_miss_on_membership_then_read():
+    clock = FakeClock()
+    store = BoundedStore(ttl_s=10, clock=clock)
+    store.put("a", 1)
+    clock.now = 9
+    assert "a" in store and store["a"] == 1
+    clock.now = 25
+    assert "a" not in store
+    assert len(store) == 0
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["evicted_ttl"]) == (1, 1, 1)
+
+
+def test_delete_frees_bytes_and_reports_missing_keys():
+    store = BoundedStore()
+    store.put("a", 1, size=10, evict_early=True)
+    assert store.delete("a")
+    assert not store.delete("a")
+    assert store.bytes == 0
+    assert store.stats()["evict_early_entries"] == 0
+    assert "a" not in store
+    assert store.stats()["misses"] == 1
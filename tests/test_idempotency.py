@@ -0,0 +1,44 @@
+import asyncio
+
+from utils.idempotency import IdempotencyCache
+
+
+def test_retry_gets_result_when_first_caller_is_cancelled():
+    async def scenario():
+        cache = IdempotencyCache()
+        runs = []
+
+        async def action():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return {"events": [], "responses": [{"text": "hi"}]}
+
+        first = asyncio.ensure_future(cache.get_or_run("key", action))
+        await asyncio.sleep(0.01)
+        retry = asyncio.ensure_future(cache.get_or_run("key", action))
+        await asyncio.sleep(0)
+        first.cancel()  # Rasa timed out and Sanic cancelled the first handler
+        assert (await retry)["responses"] == [{"text": "hi"}]
+        assert await cache.get_or_run("key", action) == await retry
+        assert len(runs) == 1
+        assert cache.stats()["runs"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_failures_are_not_stored():
+    async def scenario():
+        cache = IdempotencyCache()
+
+        async def boom():
+            raise ValueError("action failed")
+
+        for _ in range(2):
+            try:
+                await cache.get_or_run("key", boom)
+            except ValueError:
+                pass
+        assert cache.stats()["runs"] == 2
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+import pytest
+
+from utils.safety import screen
+
+MUST_MATCH = [
+    "Lately I just want to die, I can't go on like this.",
+    "Ya no quiero vivir así, estoy agotada.",
+    "Pienso en el suicidio",
+    "A veces pienso en el suicidio",
+    "En el trabajo quiero morir",
+    "Since his death I want to die",
+    "Desde su muerte quiero morir",
+    "I told her I want to kill myself",
+    "I told my friend I want to die",
+    "I think they would all be better off without me",
+    "I do not want to live anymore",
+    "I dont want to live anymore",
+    "I cannot go on",
+    "She left and I keep thinking about ending my life",
+    "Me quiero morir después de lo que pasó con ella",
+    "I'm at risk of suicide",
+    "Desde que mi paciente murió quiero morir",
+    "Después de perder a mi paciente pienso en el suicidio",
+    "lost a patient today want to die",
+    "I don't sleep I want to die",
+    "No puedo más quiero morir",
+    "No duermo nada quiero morir",
+    "No sé si quiero morir",
+    "honestly no, I dont want to be alive",
+    "I dont want to be here anymore",
+    "I no longer want to live",
+    "I cant go on",
+]
+
+MUST_NOT_MATCH = [
+    "Sometimes, a little.",
+    "I'm not suicidal, just exhausted.",
+    "I would never hurt myself.",
+    "Nunca pensaría en suicidarme.",
+    "No me quiero morir, solo descansar.",
+    "I don't really want to die.",
+    "I dont want to hurt myself.",
+    "My patient's suicide still haunts me.",
+    "My coworker is suicidal and I'm worried.",
+    "My patient was suicidal last night.",
+    "Mi paciente es suicida y no sé qué hacer.",
+    "We had suicide prevention training last month.",
+    "Tuvimos capacitación de prevención del suicidio.",
+    "The suicide risk assessment took all morning.",
+    "We follow a protocol for suicide on the unit.",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", MUST_MATCH)
+def test_screen_flags_self_directed_risk(text):
+    assert screen(text) is not None
+
+
+@pytest.mark.parametrize("text", MUST_NOT_MATCH)
+def test_screen_ignores_negated_third_party_and_professional_mentions(text):
+    assert screen(text) is None
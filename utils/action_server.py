@@ -0,0 +1,288 @@
+"""Action server with admission control.
+
+A drop-in for `rasa run actions` that serves the same `/webhook`, `/health`
+and `/actions` routes, plus `/metrics` and a `/ready` gate that only passes
+once the startup warm-up (utils/warmup.py) has finished. Retried action
+calls are answered from an idempotency cache (utils/idempotency.py) before
+admission control sees them:
+
+    python -m utils.action_server --actions actions --max-in-flight 8 --queue-budget-ms 250
+
+Point Rasa at it with `action_endpoint: url: http://localhost:5055/webhook`.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Text, Union
+
+from rasa_sdk import utils
+from rasa_sdk.constants import APPLICATION_ROOT_LOGGER_NAME, DEFAULT_KEEP_ALIVE_TIMEOUT
+from rasa_sdk.endpoint import create_app, create_argument_parser
+from rasa_sdk.events import FollowupAction, Restarted
+from rasa_sdk.executor import ActionExecutor, ActionExecutorRunResult, CollectingDispatcher
+from sanic import Sanic, response
+from sanic.worker.loader import AppLoader
+
+from utils.admission import (
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_PRIORITY_BUDGET_S,
+    DEFAULT_QUEUE_BUDGET_S,
+    AdmissionController,
+    is_in_progress,
+)
+from utils.content_loader import load_message
+from utils.idempotency import DEFAULT_TTL_S, IdempotencyCache, call_key
+from utils.warmup import warm_up
+
+logger = logging.getLogger(__name__)
+
+_thread_state = threading.local()
+
+# Enough slot state for every action to take its main path once.
+WARMUP_SLOTS: Dict[Text, Any] = {
+    "user_language": "en",
+    "current_phase": "assessment",
+    "current_question": "intrusion_1",
+    "intrusion_1_text": "Sometimes, a little.",
+    "context_1_text": "I'm a nurse in a hospital, 5 years.",
+    "item_scores": "1------------",
+    "top_domains": ["Intrusion", "Hyperarousal"],
+    "end_choice": "summary",
+}
+
+
+def busy_message(tracker: Dict[Text, Any]) -> Text:
+    """Localized "busy" text; both languages if the session has none yet."""
+    lang = ((tracker or {}).get("slots") or {}).get("user_language")
+    if lang in {"en", "es"}:
+        return load_message(lang, "busy")
+    return f"{load_message('en', 'busy')} / {load_message('es', 'busy')}"
+
+
+class _Shed(Exception):
+    """Carries the busy reply out of the idempotency cache, which must not store it."""
+
+    def __init__(self, response: ActionExecutorRunResult) -> None:
+        super().__init__("shed")
+        self.response = response
+
+
+class AdmissionControlledExecutor(ActionExecutor):
+    """Runs actions on a bounded worker pool behind an AdmissionController.
+
+    The actions are synchronous, so running them on the event loop would
+    block it and hide the queue from us; instead the loop only admits,
+    queues and sheds, and `max_in_flight` worker threads do the work.
+    """
+
+    def __init__(
+        self, admission: AdmissionController, idempotency: Optional[IdempotencyCache] = None
+    ) -> None:
+        super().__init__()
+        self.admission = admission
+        self.idempotency = idempotency
+        self._workers = ThreadPoolExecutor(
+            max_workers=admission.max_in_flight, thread_name_prefix="action"
+        )
+
+    def _run_blocking(self, action_call: Dict[Text, Any]) -> Optional[ActionExecutorRunResult]:
+        loop = getattr(_thread_state, "loop", None)
+        if loop is None:
+            loop = _thread_state.loop = asyncio.new_event_loop()
+        return loop.run_until_complete(ActionExecutor.run(self, action_call))
+
+    def _busy_response(self, tracker: Dict[Text, Any], priority: bool) -> ActionExecutorRunResult:
+        dispatcher = CollectingDispatcher()
+        dispatcher.utter_message(text=busy_message(tracker))
+        if priority:
+            # Keep the assessment; wait for the user to answer again, as a rephrase does.
+            return self._create_api_response([FollowupAction("action_listen")], dispatcher.messages)
+        # Restarting lets a new session's next message begin cleanly.
+        return self._create_api_response([Restarted()], dispatcher.messages)
+
+    def warm_up(self) -> None:
+        """Run every registered action once on this thread, bypassing admission."""
+        for name in list(self.actions):
+            action_call = {
+                "next_action": name,
+                "sender_id": "warmup",
+                "tracker": {
+                    "sender_id": "warmup",
+                    "slots": dict(WARMUP_SLOTS),
+                    "latest_message": {"text": "hi"},
+                    "events": [],
+                    "paused": False,
+                    "followup_action": None,
+                    "active_loop": {},
+                    "latest_action_name": None,
+                },
+                "domain": {},
+            }
+            try:
+                self._run_blocking(action_call)
+            except Exception as e:
+                logger.warning(f"Warm-up call to '{name}' failed: {e}")
+
+    def warm_up_workers(self) -> None:
+        """Warm every worker thread, each with its own event loop (see `_run_blocking`)."""
+        count = self.admission.max_in_flight
+        barrier = threading.Barrier(count)
+
+        def warm_one() -> None:
+            # Hold each thread until all are busy, so every task lands on a different one.
+            barrier.wait(timeout=30)
+            self.warm_up()
+
+        for future in [self._workers.submit(warm_one) for _ in range(count)]:
+            future.result()
+
+    async def _admit_and_run(self, action_call: Dict[Text, Any]) -> Optional[ActionExecutorRunResult]:
+        tracker = action_call.get("tracker") or {}
+        priority = is_in_progress(tracker)
+        if not await self.admission.acquire(priority):
+            logger.warning(
+                f"Shedding '{action_call.get('next_action')}' for "
+                f"{'in-progress' if priority else 'new'} session '{tracker.get('sender_id')}'."
+            )
+            raise _Shed(self._busy_response(tracker, priority))
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._workers, self._run_blocking, action_call)
+        finally:
+            self.admission.release()
+
+    async def run(self, action_call: Dict[Text, Any]) -> Optional[ActionExecutorRunResult]:
+        key = call_key(action_call) if self.idempotency is not None else None
+        try:
+            if key is None:
+                return await self._admit_and_run(action_call)
+            return await self.idempotency.get_or_run(key, partial(self._admit_and_run, action_call))
+        except _Shed as shed:
+            return shed.response
+
+
+def create_server_app(
+    action_executor: AdmissionControlledExecutor,
+    cors_origins: Union[Text, List[Text], None] = "*",
+    auto_reload: bool = False,
+) -> Sanic:
+    app = create_app(action_executor, cors_origins=cors_origins, auto_reload=auto_reload)
+    app.ctx.created = time.perf_counter()
+    app.ctx.ready = False
+    app.ctx.warmup = {}
+    app.ctx.warmup_error = None
+
+    async def _warm_up() -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            timings = await loop.run_in_executor(None, warm_up)
+            started = time.perf_counter()
+            # Not on the worker pool itself: warm_up_workers blocks until every worker is done.
+            await loop.run_in_executor(None, action_executor.warm_up_workers)
+            timings["executor"] = time.perf_counter() - started
+        except Exception as e:
+            logger.exception("Action server warm-up failed; /ready will keep returning 503.")
+            app.ctx.warmup_error = f"{type(e).__name__}: {e}"
+            return
+        timings["time_to_ready"] = time.perf_counter() - app.ctx.created
+        app.ctx.warmup = timings
+        app.ctx.ready = True
+        logger.info(f"Action server ready after {timings['time_to_ready']:.2f}s")
+
+    @app.after_server_start
+    async def start_warm_up(app, _):
+        app.add_task(_warm_up())
+
+    @app.get("/ready")
+    async def ready(_):
+        """Readiness gate for load balancers; /health stays the liveness check."""
+        if app.ctx.warmup_error is not None:
+            return response.json({"status": "warmup_failed", "error": app.ctx.warmup_error}, status=503)
+        if not app.ctx.ready:
+            return response.json({"status": "warming_up"}, status=503)
+        return response.json({"status": "ready", "warmup_s": app.ctx.warmup}, status=200)
+
+    @app.get("/metrics")
+    async def metrics(_):
+        metrics = {"admission": action_executor.admission.snapshot()}
+        if action_executor.idempotency is not None:
+            metrics["idempotency"] = action_executor.idempotency.stats()
+        return response.json(metrics)
+
+    return app
+
+
+def run(
+    action_executor: AdmissionControlledExecutor,
+    port: int,
+    cors_origins: Union[Text, List[Text], None] = "*",
+    auto_reload: bool = False,
+    keep_alive_timeout: int = DEFAULT_KEEP_ALIVE_TIMEOUT,
+) -> None:
+    loader = AppLoader(
+        factory=partial(
+            create_server_app,
+            action_executor,
+            cors_origins=cors_origins,
+            auto_reload=auto_reload,
+        ),
+    )
+    app = loader.load()
+    app.config.KEEP_ALIVE_TIMEOUT = keep_alive_timeout
+    host = os.environ.get("SANIC_HOST", "0.0.0.0")
+    logger.info(f"Action endpoint with admission control is up on http://{host}:{port}")
+    app.run(host=host, port=port, workers=utils.number_of_sanic_workers(), legacy=True)
+
+
+def main() -> None:
+    parser = create_argument_parser()
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help="actions allowed to run at once",
+    )
+    parser.add_argument(
+        "--queue-budget-ms",
+        type=float,
+        default=1000 * DEFAULT_QUEUE_BUDGET_S,
+        help="how long a new session may wait for a slot before it is shed",
+    )
+    parser.add_argument(
+        "--priority-budget-ms",
+        type=float,
+        default=1000 * DEFAULT_PRIORITY_BUDGET_S,
+        help="how long an in-progress session may wait for a slot before it is shed",
+    )
+    parser.add_argument(
+        "--idempotency-ttl-s",
+        type=float,
+        default=DEFAULT_TTL_S,
+        help="how long results are kept for retried action calls (0 disables the cache)",
+    )
+    args = parser.parse_args()
+
+    utils.configure_colored_logging(args.loglevel)
+    utils.configure_file_logging(
+        logging.getLogger(APPLICATION_ROOT_LOGGER_NAME),
+        args.log_file,
+        args.loglevel,
+        args.logging_config_file,
+    )
+    utils.update_sanic_log_level()
+
+    admission = AdmissionController(
+        args.max_in_flight, args.queue_budget_ms / 1000, args.priority_budget_ms / 1000
+    )
+    idempotency = IdempotencyCache(args.idempotency_ttl_s) if args.idempotency_ttl_s > 0 else None
+    action_executor = AdmissionControlledExecutor(admission, idempotency)
+    action_executor.register_package(args.actions_module or args.actions or "actions")
+    run(action_executor, args.port, args.cors, args.auto_reload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.content_loader import load_question_config
+from utils.scoring import (
+    DOMAIN_ITEM_COUNTS,
+    MAX_ITEM_SCORE,
+    _domain_from_question_id,
+    get_top_domains,
+)
+
+
+# Domains in the order the flow asks them; get_top_domains breaks ties by this order.
+DOMAIN_ORDER: List[str] = ["intrusion", "avoidance", "hyperarousal"]
+
+TOP_DOMAIN_COUNT = 2
+
+
+def is_enabled() -> bool:
+    """Whether adaptive early stopping is switched on in the question config."""
+    return bool((load_question_config().get("adaptive") or {}).get("enabled", False))
+
+
+def domain_items(domain: str) -> List[str]:
+    return [f"{domain}_{i}" for i in range(1, DOMAIN_ITEM_COUNTS[domain] + 1)]
+
+
+def _bounds(domain: str, item_scores: Dict[str, Optional[float]], skipped: Iterable[str]) -> Tuple[int, int]:
+    """Lowest and highest total the domain can still reach."""
+    skipped = set(skipped)
+    low = 0
+    open_items = 0
+    for qid in domain_items(domain):
+        value = item_scores.get(qid)
+        if value is not None:
+            low += int(value)
+        elif qid not in skipped:
+            open_items += 1
+    return low, low + open_items * MAX_ITEM_SCORE
+
+
+def _beats(other: str, other_score: int, domain: str, domain_score: int) -> bool:
+    """Whether `other` ranks above `domain` in get_top_domains."""
+    if other_score != domain_score:
+        return other_score > domain_score
+    return DOMAIN_ORDER.index(other) < DOMAIN_ORDER.index(domain)
+
+
+def domain_outcome_fixed(
+    domain: str,
+    item_scores: Dict[str, Optional[float]],
+    skipped: Iterable[str] = (),
+) -> bool:
+    """Check whether the domain's rank in get_top_domains is already decided.
+
+    Every open item can still score anywhere from 0 to MAX_ITEM_SCORE. The
+    ordered top domains only stay the same if, against every other domain,
+    it is already settled which of the two ranks higher: the other domain
+    wins even with its open items at 0 and ours at the maximum, or loses
+    even the other way round.
+    """
+    skipped = list(skipped)
+    bounds = {d: _bounds(d, item_scores, skipped) for d in DOMAIN_ORDER}
+    low, high = bounds[domain]
+    for other in DOMAIN_ORDER:
+        if other == domain:
+            continue
+        other_low, other_high = bounds[other]
+        always_above = _beats(other, other_low, domain, high)
+        never_above = not _beats(other, other_high, domain, low)
+        if not (always_above or never_above):
+            return False
+    return True
+
+
+def items_to_skip(
+    question_id: str,
+    item_scores: Dict[str, Optional[float]],
+    skipped: Iterable[str] = (),
+) -> List[str]:
+    """Return the items left in the question's domain that can no longer change the ordered top domains."""
+    domain = _domain_from_question_id(question_id or "")
+    if domain not in DOMAIN_ITEM_COUNTS:
+        return []
+    skipped = list(skipped)
+    remaining = [
+        qid for qid in domain_items(domain)
+        if item_scores.get(qid) is None and qid not in skipped
+    ]
+    if not remaining or not domain_outcome_fixed(domain, item_scores, skipped):
+        return []
+    return remaining
+
+
+def _sample_session(rng: random.Random) -> Dict[str, int]:
+    """Draw item scores for one synthetic respondent."""
+    scores = {}
+    for domain in DOMAIN_ORDER:
+        severity = rng.uniform(0, MAX_ITEM_SCORE)
+        for qid in domain_items(domain):
+            value = round(rng.gauss(severity, 1.0))
+            scores[qid] = max(0, min(MAX_ITEM_SCORE, value))
+    return scores
+
+
+def _top_domains(item_scores: Dict[str, Optional[float]]) -> List[str]:
+    totals = {
+        domain.capitalize(): sum(int(item_scores.get(qid) or 0) for qid in domain_items(domain))
+        for domain in DOMAIN_ORDER
+    }
+    return get_top_domains(totals)
+
+
+def simulate_turns_saved(sessions: int = 10000, seed: int = 0) -> Dict[str, float]:
+    """Replay synthetic sessions with and without adaptive stopping.
+
+    A turn is one question and its answer, so every skipped item saves at
+    least one turn (more if that item would have needed a rephrase).
+    """
+    rng = random.Random(seed)
+    total_items = sum(DOMAIN_ITEM_COUNTS.values())
+    skipped_total = 0
+    same_top = 0
+    for _ in range(sessions):
+        full = _sample_session(rng)
+        answered: Dict[str, Optional[float]] = {}
+        skipped: List[str] = []
+        for domain in DOMAIN_ORDER:
+            for qid in domain_items(domain):
+                if qid in skipped:
+                    continue
+                answered[qid] = full[qid]
+                skipped.extend(items_to_skip(qid, answered, skipped))
+        skipped_total += len(skipped)
+        if _top_domains(answered) == _top_domains(full):
+            same_top += 1
+    return {
+        "sessions": sessions,
+        "items_per_session": total_items,
+        "avg_turns_saved": skipped_total / sessions if sessions else 0.0,
+        "pct_turns_saved": 100.0 * skipped_total / (sessions * total_items) if sessions else 0.0,
+        "pct_same_top_domains": 100.0 * same_top / sessions if sessions else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate turns saved by adaptive early stopping.")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for key, value in simulate_turns_saved(args.sessions, args.seed).items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
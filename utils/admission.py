@@ -0,0 +1,219 @@
+"""Admission control and load shedding for action execution.
+
+At most `max_in_flight` actions run at once. Everything else waits in one of
+two queues: conversations already past the context phase are served first and
+may wait up to `priority_budget_s`, while new sessions only wait
+`queue_budget_s`; past its budget a request is shed with a "busy" reply
+instead of timing out.
+
+    python -m utils.admission          # local load test
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Text
+
+# Phases after `context`; conversations here already invested in the assessment.
+IN_PROGRESS_PHASES = {"assessment", "scoring", "summary", "closing"}
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_QUEUE_BUDGET_S = 0.25
+DEFAULT_PRIORITY_BUDGET_S = 5.0
+
+
+def is_in_progress(tracker: Dict[Text, Any]) -> bool:
+    """Whether a serialized tracker belongs to a conversation past the context phase."""
+    slots = (tracker or {}).get("slots") or {}
+    return slots.get("current_phase") in IN_PROGRESS_PHASES
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        queue_budget_s: float = DEFAULT_QUEUE_BUDGET_S,
+        priority_budget_s: float = DEFAULT_PRIORITY_BUDGET_S,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.queue_budget_s = queue_budget_s
+        self.priority_budget_s = priority_budget_s
+        self.in_flight = 0
+        self._priority: Deque[asyncio.Future] = deque()
+        self._new: Deque[asyncio.Future] = deque()
+        self.counters: Counter = Counter()
+        self._queue_time = {"priority": 0.0, "new": 0.0}
+
+    def _waiting(self) -> int:
+        return len(self._priority) + len(self._new)
+
+    async def acquire(self, priority: bool) -> bool:
+        """Wait for a slot; returns False if the request should be shed."""
+        kind = "priority" if priority else "new"
+        if self.in_flight < self.max_in_flight and not self._waiting():
+            self.in_flight += 1
+            self.counters[f"admitted_{kind}"] += 1
+            return True
+
+        self.counters[f"queued_{kind}"] += 1
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._priority if priority else self._new
+        queue.append(waiter)
+        started = time.perf_counter()
+        timeout = self.priority_budget_s if priority else self.queue_budget_s
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            # The client went away (Sanic cancels the handler); don't leave a dead waiter behind.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                queue.remove(waiter)
+            self.counters[f"cancelled_{kind}"] += 1
+            raise
+        self._queue_time[kind] += time.perf_counter() - started
+        if waiter.done():
+            # release() handed its slot straight to us.
+            self.counters[f"admitted_{kind}"] += 1
+            return True
+        waiter.cancel()
+        queue.remove(waiter)
+        self.counters[f"shed_{kind}"] += 1
+        return False
+
+    def release(self) -> None:
+        for queue in (self._priority, self._new):
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    return
+        self.in_flight -= 1
+
+    def snapshot(self) -> Dict[Text, Any]:
+        queued = {
+            kind: self.counters[f"queued_{kind}"] for kind in ("priority", "new")
+        }
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": {"priority": len(self._priority), "new": len(self._new)},
+            "queue_budget_s": self.queue_budget_s,
+            "priority_budget_s": self.priority_budget_s,
+            "admitted": {
+                kind: self.counters[f"admitted_{kind}"] for kind in ("priority", "new")
+            },
+            "queued": queued,
+            "shed": {kind: self.counters[f"shed_{kind}"] for kind in ("priority", "new")},
+            "cancelled": {kind: self.counters[f"cancelled_{kind}"] for kind in ("priority", "new")},
+            "avg_queue_time_s": {
+                kind: self._queue_time[kind] / queued[kind] if queued[kind] else 0.0
+                for kind in ("priority", "new")
+            },
+        }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def load_test(
+    controller: Optional[AdmissionController],
+    requests: int = 4000,
+    rate: float = 1200.0,
+    service_time_s: float = 0.01,
+    workers: int = DEFAULT_MAX_IN_FLIGHT,
+    new_share: float = 0.3,
+    seed: int = 0,
+) -> Dict[Text, Any]:
+    """Drive a burst of synthetic action calls through the controller.
+
+    Each call blocks a worker thread for `service_time_s`, so capacity is
+    about `workers / service_time_s` calls per second; `rate` above that is
+    overload. Pass `controller=None` to see the same burst without admission
+    control, where every call just queues on the thread pool.
+    """
+    rng = random.Random(seed)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    loop = asyncio.get_running_loop()
+    latencies: Dict[Text, List[float]] = {"priority": [], "new": []}
+    shed = Counter()
+
+    async def call(priority: bool) -> None:
+        kind = "priority" if priority else "new"
+        started = time.perf_counter()
+        if controller is not None and not await controller.acquire(priority):
+            shed[kind] += 1
+            return
+        try:
+            await loop.run_in_executor(pool, time.sleep, service_time_s)
+        finally:
+            if controller is not None:
+                controller.release()
+        latencies[kind].append(time.perf_counter() - started)
+
+    tasks = []
+    began = time.perf_counter()
+    arrival = 0.0
+    for _ in range(requests):
+        # Sleep to an absolute schedule so the offered rate holds even past timer resolution.
+        arrival += rng.expovariate(rate)
+        delay = arrival - (time.perf_counter() - began)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(call(rng.random() >= new_share)))
+    await asyncio.gather(*tasks)
+    pool.shutdown()
+    return {
+        kind: {
+            "served": len(values),
+            "shed": shed[kind],
+            "p50_ms": 1000 * _percentile(values, 50),
+            "p99_ms": 1000 * _percentile(values, 99),
+        }
+        for kind, values in latencies.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local load test for action admission control.")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--rate", type=float, default=1200.0, help="arrivals per second")
+    parser.add_argument("--service-ms", type=float, default=10.0)
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument("--queue-budget-ms", type=float, default=1000 * DEFAULT_QUEUE_BUDGET_S)
+    parser.add_argument("--priority-budget-ms", type=float, default=1000 * DEFAULT_PRIORITY_BUDGET_S)
+    args = parser.parse_args()
+
+    for label, controller in (
+        ("without admission control", None),
+        (
+            "with admission control",
+            AdmissionController(
+                args.max_in_flight, args.queue_budget_ms / 1000, args.priority_budget_ms / 1000
+            ),
+        ),
+    ):
+        result = asyncio.run(
+            load_test(
+                controller,
+                requests=args.requests,
+                rate=args.rate,
+                service_time_s=args.service_ms / 1000,
+                workers=args.max_in_flight,
+            )
+        )
+        print(label)
+        for kind, stats in result.items():
+            print(
+                f"  {kind:<8} served={stats['served']:<5} shed={stats['shed']:<5} "
+                f"p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms"
+            )
+        if controller is not None:
+            print(f"  metrics: {controller.snapshot()}")
@@ -0,0 +1,161 @@
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+
+class _Entry:
+    __slots__ = ("value", "size", "touched", "evict_early")
+
+    def __init__(self, value: Any, size: int, touched: float, evict_early: bool) -> None:
+        self.value = value
+        self.size = size
+        self.touched = touched
+        self.evict_early = evict_early
+
+
+class BoundedStore:
+    """In-memory key/value store bounded by entry count, bytes and idle TTL.
+
+    Entries idle for longer than `ttl_s` expire. When a put goes over
+    `max_entries` or `max_bytes`, entries marked `evict_early` go first
+    (least recently used among them), then the least recently used of the
+    rest. Any limit left as None is not enforced.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._clock = clock
+        # Both dicts are kept in least-recently-used-first order.
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._early: "OrderedDict[Hashable, None]" = OrderedDict()
+        self.bytes = 0
+        self.counters: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # InMemoryTrackerStore tests `key in store` before reading `store[key]`. The
+        # test counts misses and expiries and refreshes a live entry, so the read
+        # that follows cannot expire it and the pair counts one hit or one miss.
+        return self._lookup(key, count_hit=False) is not None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        entry = self._lookup(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry.value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.put(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        if key not in self._entries:
+            raise KeyError(key)
+        self._remove(key)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.keys())
+
+    def keys(self) -> List[Hashable]:
+        self.expire()
+        return list(self._entries.keys())
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.ttl_s is not None and now - entry.touched > self.ttl_s
+
+    def _lookup(self, key: Hashable, count_hit: bool = True) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        if self._expired(entry, now):
+            self._remove(key)
+            self.counters["evicted_ttl"] += 1
+            self.counters["misses"] += 1
+            return None
+        entry.touched = now
+        self._entries.move_to_end(key)
+        if entry.evict_early:
+            self._early.move_to_end(key)
+        if count_hit:
+            self.counters["hits"] += 1
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._lookup(key)
+        return default if entry is None else entry.value
+
+    def put(self, key: Hashable, value: Any, size: int = 0, evict_early: bool = False) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, size, self._clock(), evict_early)
+        if evict_early:
+            self._early[key] = None
+        self.bytes += size
+        self.counters["puts"] += 1
+        self.expire()
+        self._shrink()
+
+    def delete(self, key: Hashable) -> bool:
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._early.pop(key, None)
+        self.bytes -= entry.size
+
+    def expire(self) -> int:
+        """Drop entries idle past the TTL; oldest first, so stop at the first live one."""
+        if self.ttl_s is None:
+            return 0
+        now = self._clock()
+        dropped = 0
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if not self._expired(entry, now):
+                break
+            self._remove(key)
+            dropped += 1
+        self.counters["evicted_ttl"] += dropped
+        return dropped
+
+    def _over_limit(self) -> bool:
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.bytes > self.max_bytes
+
+    def _shrink(self) -> None:
+        while self._entries and self._over_limit():
+            if self._early:
+                key = next(iter(self._early))
+                self.counters["evicted_early"] += 1
+            else:
+                key = next(iter(self._entries))
+                self.counters["evicted_lru"] += 1
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "evict_early_entries": len(self._early),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            **{name: self.counters[name] for name in (
+                "puts", "hits", "misses", "evicted_ttl", "evicted_early", "evicted_lru"
+            )},
+        }
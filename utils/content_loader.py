@@ -1,26 +1,36 @@
 import yaml
 import os
+from functools import lru_cache
 
 CONTENT_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'i18n')
 
+
+@lru_cache(maxsize=None)
+def _load_content(file_name: str) -> dict:
+    """Parse a content file once; the files only change on deploy."""
+    file_path = os.path.join(CONTENT_DIR, file_name)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
 def load_questions(lang: str, question_id: str, variant_index: int) -> str:
     """Load a specific question variant."""
-    file_path = os.path.join(CONTENT_DIR, f'{lang}.yml')
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+    data = _load_content(f'{lang}.yml')
     return data['questions'][question_id]['variants'][variant_index]
 
 
 def load_summary(lang: str) -> str:
     """Load the summary template."""
-    file_path = os.path.join(CONTENT_DIR, f'{lang}.yml')
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+    data = _load_content(f'{lang}.yml')
     return data['summaries']['final']
 
 
 def load_question_config():
     """Load question configuration."""
-    file_path = os.path.join(CONTENT_DIR, 'config.yml')
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+    return _load_content('config.yml')
+
+
+def load_message(lang: str, key: str) -> str:
+    """Load a system message (e.g. `busy`)."""
+    data = _load_content(f'{lang}.yml')
+    return data['system'][key]
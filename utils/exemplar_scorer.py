@@ -0,0 +1,353 @@
+"""Nearest-neighbour scoring against labeled exemplar answers.
+
+An optional backend for ActionParseScore, switched on in config.yml with
+`scoring: backend: exemplar` and reached through utils.scoring.score_answer,
+so NumPy and faiss are only imported when it is on. Answers are embedded as
+hashed character n-gram vectors (IDF-weighted, L2-normalised) and searched
+against a faiss inner-product index of the en/es exemplars in
+data/i18n/exemplars.yml, one index per domain. The top-k neighbour labels,
+weighted by similarity, give the 0-4 score. The lexical rules stay in charge
+where they are sure (no answer, explicit absence, STRONG markers), and
+answers with no close exemplar fall back to parse_score.
+
+Without faiss installed the same vectors are searched with NumPy.
+
+    python -m utils.exemplar_scorer            # accuracy and latency benchmark
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.content_loader import _load_content, load_question_config
+from utils.scoring import MAX_ITEM_SCORE, _domain_from_question_id, lexical_override, parse_score
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - faiss-cpu is optional
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+DIM = 2048
+NGRAM_SIZES = (2, 3, 4)
+DEFAULT_K = 5
+DEFAULT_MIN_SIMILARITY = 0.25
+DEFAULT_NLIST = 4
+DEFAULT_NPROBE = 2
+
+EXEMPLAR_FILE = "exemplars.yml"
+DOMAINS = ("intrusion", "avoidance", "hyperarousal")
+
+_FOLD = str.maketrans("áéíóúüñ’‘", "aeiouun''")
+_NON_WORD = re.compile(r"[^a-z0-9' ]+")
+
+
+def _grams(text: str) -> List[str]:
+    words = _NON_WORD.sub(" ", text.lower().translate(_FOLD)).split()
+    padded = f" {' '.join(words)} "
+    return [padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)]
+
+
+def _hashed_counts(texts: Sequence[str]) -> np.ndarray:
+    """Raw log-scaled n-gram counts, one row per text."""
+    out = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for gram in _grams(text):
+            out[row, zlib.crc32(gram.encode("utf-8")) % DIM] += 1.0
+    return np.log1p(out, out=out)
+
+
+def embed(texts: Sequence[str], idf: np.ndarray) -> np.ndarray:
+    """IDF-weighted, L2-normalised hashed n-gram vectors."""
+    vectors = _hashed_counts(texts) * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _idf(counts: np.ndarray) -> np.ndarray:
+    df = np.count_nonzero(counts, axis=0)
+    return np.log((1 + counts.shape[0]) / (1 + df)).astype(np.float32) + 1.0
+
+
+def load_exemplars() -> Dict[str, List[Tuple[str, int]]]:
+    """(text, label) pairs per domain; `common` answers are shared by all domains."""
+    data = _load_content(EXEMPLAR_FILE)
+    shared = [
+        (text, int(label))
+        for label, by_lang in data["common"].items()
+        for texts in by_lang.values()
+        for text in texts
+    ]
+    return {
+        domain: shared + [
+            (text, int(label))
+            for label, by_lang in data[domain].items()
+            for texts in by_lang.values()
+            for text in texts
+        ]
+        for domain in DOMAINS
+    }
+
+
+class _NumpyFlatIndex:
+    """Brute-force inner-product search with faiss' `search` signature."""
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self.vectors = vectors
+
+    @property
+    def ntotal(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        sims = queries @ self.vectors.T
+        top = np.argsort(-sims, axis=1)[:, :k]
+        return np.take_along_axis(sims, top, axis=1), top
+
+
+def _build_index(vectors: np.ndarray, index_type: str, nlist: int, nprobe: int):
+    if faiss is None:
+        if index_type != "flat":
+            logger.warning(f"faiss is not installed; using a NumPy flat index instead of '{index_type}'.")
+        return _NumpyFlatIndex(vectors)
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(DIM)
+    elif index_type == "ivf":
+        quantizer = faiss.IndexFlatIP(DIM)
+        index = faiss.IndexIVFFlat(quantizer, DIM, min(nlist, len(vectors)), faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.nprobe = nprobe
+    else:
+        raise ValueError(f"Unknown exemplar index type '{index_type}' (expected 'flat' or 'ivf').")
+    index.add(vectors)
+    return index
+
+
+class ExemplarScorer:
+    """Per-domain exemplar indexes plus the IDF weights they were built with."""
+
+    def __init__(
+        self,
+        indexes: Dict[str, object],
+        labels: Dict[str, np.ndarray],
+        idf: np.ndarray,
+        k: int = DEFAULT_K,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ) -> None:
+        self.indexes = indexes
+        self.labels = labels
+        self.idf = idf
+        self.k = k
+        self.min_similarity = min_similarity
+
+    @classmethod
+    def build(
+        cls,
+        exemplars: Dict[str, List[Tuple[str, int]]],
+        index_type: str = "flat",
+        nlist: int = DEFAULT_NLIST,
+        nprobe: int = DEFAULT_NPROBE,
+        **kwargs,
+    ) -> "ExemplarScorer":
+        # IDF over the distinct exemplar texts, so shared answers count once.
+        distinct = sorted({text for pairs in exemplars.values() for text, _ in pairs})
+        idf = _idf(_hashed_counts(distinct))
+        indexes, labels = {}, {}
+        for domain, pairs in exemplars.items():
+            vectors = embed([text for text, _ in pairs], idf)
+            indexes[domain] = _build_index(vectors, index_type, nlist, nprobe)
+            labels[domain] = np.array([label for _, label in pairs], dtype=np.int8)
+        return cls(indexes, labels, idf, **kwargs)
+
+    def save(self, index_dir: str, fingerprint: str) -> None:
+        if faiss is None:
+            return
+        os.makedirs(index_dir, exist_ok=True)
+        for domain, index in self.indexes.items():
+            faiss.write_index(index, os.path.join(index_dir, f"{domain}.faiss"))
+            np.save(os.path.join(index_dir, f"{domain}.labels.npy"), self.labels[domain])
+        np.save(os.path.join(index_dir, "idf.npy"), self.idf)
+        with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint}, f)
+
+    @classmethod
+    def load(cls, index_dir: str, fingerprint: str, **kwargs) -> Optional["ExemplarScorer"]:
+        """The saved indexes, or None if they are missing or were built from other exemplars."""
+        meta_path = os.path.join(index_dir, "meta.json")
+        if faiss is None or not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            if json.load(f).get("fingerprint") != fingerprint:
+                return None
+        indexes = {
+            domain: faiss.read_index(os.path.join(index_dir, f"{domain}.faiss")) for domain in DOMAINS
+        }
+        labels = {
+            domain: np.load(os.path.join(index_dir, f"{domain}.labels.npy")) for domain in DOMAINS
+        }
+        return cls(indexes, labels, np.load(os.path.join(index_dir, "idf.npy")), **kwargs)
+
+    def _aggregate(self, sims: np.ndarray, ids: np.ndarray, labels: np.ndarray) -> Optional[int]:
+        keep = ids >= 0
+        sims, ids = sims[keep], ids[keep]
+        if not len(ids) or sims[0] < self.min_similarity:
+            return None
+        weights = np.clip(sims, 0.0, None)
+        level = float(weights @ labels[ids]) / float(weights.sum())
+        return max(0, min(MAX_ITEM_SCORE, int(level + 0.5)))
+
+    def score_batch(self, texts: Sequence[str], question_ids: Sequence[str]) -> List[int]:
+        """Score many answers with one embedding pass and one search per domain."""
+        scores: List[Optional[int]] = [lexical_override(text) for text in texts]
+        by_domain: Dict[str, List[int]] = {}
+        for i, question_id in enumerate(question_ids):
+            domain = _domain_from_question_id(question_id or "")
+            if scores[i] is None and domain in self.indexes:
+                by_domain.setdefault(domain, []).append(i)
+        for domain, rows in by_domain.items():
+            queries = embed([texts[i] for i in rows], self.idf)
+            sims, ids = self.indexes[domain].search(queries, self.k)
+            for row, i in enumerate(rows):
+                scores[i] = self._aggregate(sims[row], ids[row], self.labels[domain])
+        return [
+            parse_score(text, question_id) if score is None else score
+            for text, question_id, score in zip(texts, question_ids, scores)
+        ]
+
+    def score(self, text: str, question_id: str = "") -> int:
+        return self.score_batch([text], [question_id])[0]
+
+
+def _settings() -> Dict:
+    return (load_question_config().get("scoring") or {}).get("exemplar") or {}
+
+
+@lru_cache(maxsize=None)
+def get_scorer() -> ExemplarScorer:
+    """The configured scorer, loaded from `index_dir` when it is current, else built (and saved)."""
+    settings = _settings()
+    index_type = settings.get("index", "flat")
+    kwargs = {
+        "k": settings.get("k", DEFAULT_K),
+        "min_similarity": settings.get("min_similarity", DEFAULT_MIN_SIMILARITY),
+    }
+    exemplars = load_exemplars()
+    fingerprint = hashlib.sha1(
+        json.dumps([exemplars, DIM, NGRAM_SIZES, index_type], sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    index_dir = settings.get("index_dir")
+    if index_dir:
+        scorer = ExemplarScorer.load(index_dir, fingerprint, **kwargs)
+        if scorer is not None:
+            logger.info(f"Loaded exemplar indexes from {index_dir}")
+            return scorer
+    scorer = ExemplarScorer.build(
+        exemplars,
+        index_type=index_type,
+        nlist=settings.get("nlist", DEFAULT_NLIST),
+        nprobe=settings.get("nprobe", DEFAULT_NPROBE),
+        **kwargs,
+    )
+    if index_dir:
+        scorer.save(index_dir, fingerprint)
+    return scorer
+
+
+# Answers written independently of the exemplar file, with the score a rater
+# would give. Keep every one below HELD_OUT_MAX_SIMILARITY to its nearest
+# exemplar (benchmark() reports the largest), or it measures recall, not scoring.
+HELD_OUT_MAX_SIMILARITY = 0.5
+HELD_OUT: List[Tuple[str, str, int]] = [
+    ("Honestly no, that's not something I deal with.", "intrusion_1", 0),
+    ("I haven't experienced anything like that.", "avoidance_1", 0),
+    ("En calma, eso no me ocurre.", "hyperarousal_2", 0),
+    ("Nope, my mind stays clear after work.", "intrusion_4", 0),
+    ("Sólo me pasó una vez hace semanas.", "intrusion_3", 1),
+    ("Maybe a single time since the incident.", "intrusion_2", 1),
+    ("Seldom, I mostly shrug it off.", "hyperarousal_4", 1),
+    ("Infrequently, it passes quickly.", "avoidance_2", 1),
+    ("Tal vez un par de veces este mes, poca cosa.", "hyperarousal_1", 1),
+    ("About half the time, I'd say.", "intrusion_5", 2),
+    ("A moderate amount, especially after tough cases.", "hyperarousal_3", 2),
+    ("Un término medio, ni mucho ni poco.", "avoidance_1", 2),
+    ("It depends; certain smells bring it back.", "intrusion_1", 2),
+    ("I'd rather skip the topic when coworkers mention it.", "avoidance_2", 2),
+    ("Frequently enough that my partner noticed.", "hyperarousal_5", 3),
+    ("Casi a diario y me cuesta sacármelo de encima.", "intrusion_2", 3),
+    ("I dread going into that room so I make excuses.", "avoidance_1", 3),
+    ("My temper is short with my kids these days.", "hyperarousal_6", 3),
+    ("Those scenes flash through my mind during rounds.", "intrusion_4", 3),
+    ("Me despierto sobresaltada varias noches por semana.", "hyperarousal_2", 3),
+    ("It consumes every waking hour.", "intrusion_3", 4),
+    ("I quit taking shifts on that floor entirely.", "avoidance_2", 4),
+    ("I'm exhausted, I lie awake until dawn every night.", "hyperarousal_4", 4),
+    ("No me deja en paz ni un minuto.", "intrusion_5", 4),
+    ("Estoy en tensión permanente, me tiembla todo.", "hyperarousal_6", 4),
+]
+
+
+def benchmark(scorer: ExemplarScorer, repeat: int = 200) -> Dict[str, float]:
+    """Accuracy on HELD_OUT against parse_score, and per-query latency."""
+    texts = [text for text, _, _ in HELD_OUT]
+    question_ids = [qid for _, qid, _ in HELD_OUT]
+    truth = np.array([label for _, _, label in HELD_OUT])
+    lexical = np.array([parse_score(t, q) for t, q in zip(texts, question_ids)])
+    exemplar = np.array(scorer.score_batch(texts, question_ids))
+    nearest = max(
+        float(scorer.indexes[_domain_from_question_id(q)].search(embed([t], scorer.idf), 1)[0][0][0])
+        for t, q in zip(texts, question_ids)
+    )
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text, question_id in zip(texts, question_ids):
+            scorer.score(text, question_id)
+    single_us = 1e6 * (time.perf_counter() - started) / (repeat * len(texts))
+
+    batch_texts, batch_ids = texts * 50, question_ids * 50
+    started = time.perf_counter()
+    for _ in range(max(1, repeat // 50)):
+        scorer.score_batch(batch_texts, batch_ids)
+    batch_us = 1e6 * (time.perf_counter() - started) / (max(1, repeat // 50) * len(batch_texts))
+
+    return {
+        "lexical_exact": float(np.mean(lexical == truth)),
+        "lexical_within_1": float(np.mean(abs(lexical - truth) <= 1)),
+        "exemplar_exact": float(np.mean(exemplar == truth)),
+        "exemplar_within_1": float(np.mean(abs(exemplar - truth) <= 1)),
+        "max_exemplar_similarity": nearest,
+        "single_us": single_us,
+        "batch_us": batch_us,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the exemplar scorer.")
+    parser.add_argument("--index", choices=["flat", "ivf"], default="flat")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    scorer = ExemplarScorer.build(load_exemplars(), index_type=args.index)
+    print(f"built {args.index} indexes in {1000 * (time.perf_counter() - started):.1f} ms "
+          f"({'faiss' if faiss is not None else 'numpy'})")
+    for text, question_id, label in HELD_OUT:
+        print(f"{label} lexical={parse_score(text, question_id)} exemplar={scorer.score(text, question_id)}  {text}")
+    result = benchmark(scorer, args.repeat)
+    print(
+        f"exact: lexical {result['lexical_exact']:.0%}, exemplar {result['exemplar_exact']:.0%}; "
+        f"within 1: lexical {result['lexical_within_1']:.0%}, exemplar {result['exemplar_within_1']:.0%}"
+    )
+    print(f"held-out set: {len(HELD_OUT)} answers, nearest exemplar similarity <= {result['max_exemplar_similarity']:.2f}")
+    if result["max_exemplar_similarity"] >= HELD_OUT_MAX_SIMILARITY:
+        print(f"warning: a held-out answer is within {HELD_OUT_MAX_SIMILARITY} of an exemplar")
+    print(f"latency: {result['single_us']:.0f} us/query single, {result['batch_us']:.0f} us/query batched")
@@ -0,0 +1,79 @@
+"""Tracker footprint of simulated sessions.
+
+Replays scripted sessions through the actions with the flow simulator
+(utils/simulator.py) and reports what a tracker store keeps for each one:
+the JSON slot state when the session ends, before `end` restarts it, and
+the JSON event log made of the user turns and the events the actions
+returned. Run it on two revisions with the same seed to compare them:
+
+    python -m utils.footprint --sessions 300
+"""
+import argparse
+import json
+import random
+from collections import Counter
+from typing import Any, Dict, List, Optional, Text
+
+from utils.simulator import FlowSimulator, ScriptedUser, SimTracker
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+class FootprintSimulator(FlowSimulator):
+    """FlowSimulator that measures the slot state before a restart wipes it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.final_slots: Optional[Dict[Text, Any]] = None
+
+    def _apply(self, tracker: SimTracker, events: List[Dict[Text, Any]]) -> Optional[Text]:
+        if any(event.get("event") == "restart" for event in events):
+            self.final_slots = dict(tracker.slots)
+        return super()._apply(tracker, events)
+
+
+def measure(sessions: int, seed: int = 0) -> Dict[Text, Any]:
+    """Average slot state and event log sizes over `sessions` scripted sessions."""
+    rng = random.Random(seed)
+    simulator = FootprintSimulator()
+    slot_bytes = event_bytes = slot_events = 0
+    slot_events_by_name: Counter = Counter()
+    for i in range(sessions):
+        simulator.final_slots = None
+        tracker = simulator.run_session(ScriptedUser(rng), sender_id=f"footprint-{seed}-{i}")
+        slot_bytes += _json_size(simulator.final_slots if simulator.final_slots is not None else tracker.slots)
+        event_bytes += _json_size(tracker.events)
+        for event in tracker.events:
+            if event.get("event") == "slot":
+                slot_events += 1
+                slot_events_by_name[event["name"]] += 1
+    sessions = sessions or 1
+    return {
+        "slot_state_bytes": slot_bytes / sessions,
+        "event_log_bytes": event_bytes / sessions,
+        "slot_events": slot_events / sessions,
+        "slot_events_by_name": {name: count / sessions for name, count in slot_events_by_name.most_common()},
+    }
+
+
+def format_footprint(result: Dict[Text, Any]) -> Text:
+    lines = [
+        f"slot state per session: {result['slot_state_bytes']:.0f} bytes",
+        f"event log per session: {result['event_log_bytes'] / 1024:.1f} KiB",
+        f"slot events per session: {result['slot_events']:.1f}",
+        "",
+        "slot events per session by slot:",
+    ]
+    for name, count in result["slot_events_by_name"].items():
+        lines.append(f"  {name:<28} {count:5.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure tracker slot state and event log size per session.")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(format_footprint(measure(args.sessions, args.seed)))
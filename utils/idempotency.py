@@ -0,0 +1,232 @@
+"""Idempotent action execution for retried requests.
+
+When Rasa gives up waiting on the action server it sends the same action
+call again. Both calls carry the same tracker, so they are keyed by
+(sender_id, action name, event count, last event timestamp, message id):
+a retry that arrives while the first call is still running waits for it,
+and one that arrives later gets the stored result, so the action runs once
+and its utterances and slot updates are not produced twice. The action runs
+in its own task, so when Rasa's timeout closes the first connection and
+Sanic cancels that handler, the action still finishes and its result is
+kept for the retry. Results are kept in a BoundedStore with a short TTL;
+failures are never stored.
+
+    python -m utils.idempotency        # local retry load test
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Text, Tuple
+
+from utils.bounded_store import BoundedStore
+
+DEFAULT_TTL_S = 120.0
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def call_key(action_call: Dict[Text, Any]) -> Optional[Tuple[Hashable, ...]]:
+    """Identity of an action call; None when the call cannot be told apart from others."""
+    tracker = action_call.get("tracker") or {}
+    sender_id = tracker.get("sender_id") or action_call.get("sender_id")
+    action_name = action_call.get("next_action")
+    if not sender_id or not action_name:
+        return None
+    events = tracker.get("events") or []
+    last_timestamp = events[-1].get("timestamp") if events else None
+    message_id = (tracker.get("latest_message") or {}).get("message_id")
+    return sender_id, action_name, len(events), last_timestamp, message_id
+
+
+def _result_size(result: Any) -> int:
+    """Approximate bytes held for a result, as its JSON length."""
+    if hasattr(result, "model_dump_json"):  # ActionExecutorRunResult is a pydantic model
+        return len(result.model_dump_json())
+    return len(json.dumps(result))
+
+
+class IdempotencyCache:
+    """Runs each distinct action call once and replays its result to retries."""
+
+    def __init__(
+        self,
+        ttl_s: Optional[float] = DEFAULT_TTL_S,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.store = BoundedStore(max_entries=max_entries, max_bytes=max_bytes, ttl_s=ttl_s)
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self.counters: Counter = Counter()
+
+    async def get_or_run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        self.counters["calls"] += 1
+        cached = self.store.get(key)
+        if cached is not None:
+            self.counters["hits"] += 1
+            return cached
+        pending = self._pending.get(key)
+        if pending is not None:
+            # The original call is still running; share its outcome.
+            self.counters["joined"] += 1
+        else:
+            self.counters["runs"] += 1
+            pending = asyncio.ensure_future(self._run(key, compute))
+            # Retrieve a failure nobody is left waiting for, so it is not logged as lost.
+            pending.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._pending[key] = pending
+        # A cancelled caller stops waiting; the action itself carries on.
+        return await asyncio.shield(pending)
+
+    async def _run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await compute()
+            if result is not None:
+                self.store.put(key, result, size=_result_size(result))
+            return result
+        finally:
+            del self._pending[key]
+
+    def stats(self) -> Dict[Text, Any]:
+        """Hit rate (stored and in-flight replays over all calls) and memory use."""
+        calls = self.counters["calls"]
+        replayed = self.counters["hits"] + self.counters["joined"]
+        store = self.store.stats()
+        return {
+            "calls": calls,
+            "runs": self.counters["runs"],
+            "hits": self.counters["hits"],
+            "joined": self.counters["joined"],
+            "hit_rate": replayed / calls if calls else 0.0,
+            "in_flight": len(self._pending),
+            "entries": store["entries"],
+            "bytes": store["bytes"],
+            "max_bytes": store["max_bytes"],
+            "ttl_s": store["ttl_s"],
+            "evicted": store["evicted_ttl"] + store["evicted_lru"],
+        }
+
+
+# A typical ActionAskQuestion result, for sizing.
+SAMPLE_RESULT: Dict[Text, Any] = {
+    "events": [
+        {"event": "slot", "timestamp": None, "name": "current_question", "value": "intrusion_2"},
+        {"event": "slot", "timestamp": None, "name": "rephrase_count", "value": 0},
+    ],
+    "responses": [
+        {
+            "text": "Thanks for sharing. Have unwanted memories or thoughts from past stressful "
+            "moments been showing up for you?",
+            "buttons": [],
+            "elements": [],
+            "custom": {},
+            "template": None,
+            "response": None,
+            "image": None,
+            "attachment": None,
+        }
+    ],
+}
+
+
+async def retry_test(
+    cache: Optional[IdempotencyCache],
+    requests: int = 3000,
+    rate: float = 500.0,
+    service_time_s: float = 0.02,
+    slow_share: float = 0.05,
+    slow_time_s: float = 0.5,
+    timeout_s: float = 0.3,
+    lost_share: float = 0.02,
+    retries: int = 2,
+    seed: int = 0,
+) -> Dict[Text, Any]:
+    """Synthetic clients that retry an action call when it outlives `timeout_s`.
+
+    A `slow_share` of calls take `slow_time_s` (a cold worker, a GC pause),
+    which trips the client timeout while the call is still running; as with
+    Sanic on a closed connection, the timed-out attempt is cancelled. A
+    `lost_share` of responses are dropped on the way back and retried after
+    the call finished. Pass `cache=None` to see how much work the retries
+    cause without idempotency.
+    """
+    rng = random.Random(seed)
+    executions = Counter()
+
+    async def action(key: Tuple[int, int], slow: bool) -> Dict[Text, Any]:
+        executions[key] += 1
+        await asyncio.sleep(slow_time_s if slow else service_time_s)
+        return SAMPLE_RESULT
+
+    def work(key: Tuple[int, int], slow: bool) -> Awaitable[Dict[Text, Any]]:
+        # Like run_in_executor: cancelling the awaiting handler does not stop the worker thread.
+        return asyncio.shield(asyncio.ensure_future(action(key, slow)))
+
+    async def attempt(key: Tuple[int, int], slow: bool) -> None:
+        if cache is None:
+            await work(key, slow)
+        else:
+            await cache.get_or_run(key, lambda: work(key, slow))
+
+    async def client(i: int) -> None:
+        key = (i, 0)  # one sender, one tracker state
+        slow = rng.random() < slow_share
+        lost = rng.random() < lost_share
+        for _ in range(1 + retries):
+            task = asyncio.ensure_future(attempt(key, slow))
+            done, _ = await asyncio.wait([task], timeout=timeout_s)
+            if not done:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                continue
+            if not lost:
+                break
+            lost = False
+
+    clients = []
+    began = time.perf_counter()
+    arrival = 0.0
+    for i in range(requests):
+        arrival += rng.expovariate(rate)
+        delay = arrival - (time.perf_counter() - began)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        clients.append(asyncio.ensure_future(client(i)))
+    await asyncio.gather(*clients)
+    return {
+        "requests": requests,
+        "executions": sum(executions.values()),
+        "duplicate_executions": sum(n - 1 for n in executions.values()),
+        **({"cache": cache.stats()} if cache is not None else {}),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local retry load test for the idempotency cache.")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=500.0, help="arrivals per second")
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--lost-share", type=float, default=0.02)
+    parser.add_argument("--timeout-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    for label, cache in (("without idempotency", None), ("with idempotency", IdempotencyCache())):
+        result = asyncio.run(
+            retry_test(
+                cache,
+                requests=args.requests,
+                rate=args.rate,
+                slow_share=args.slow_share,
+                lost_share=args.lost_share,
+                timeout_s=args.timeout_ms / 1000,
+            )
+        )
+        print(label)
+        print(f"  {result['requests']} calls -> {result['executions']} executions "
+              f"({result['duplicate_executions']} duplicates)")
+        if "cache" in result:
+            stats = result["cache"]
+            print(f"  hit rate {stats['hit_rate']:.1%} ({stats['hits']} stored, {stats['joined']} in flight), "
+                  f"{stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB")
@@ -0,0 +1,393 @@
+"""Always-on safety screener for free-text answers.
+
+Risk phrases from the en/es lexicons are compiled once into a token-level
+Aho-Corasick automaton, so screening a message is one pass over its tokens
+no matter how many phrases there are. A match does not count when:
+
+- a negation cue comes just before it in the same clause ("I'm not suicidal",
+  "nunca pensaría en suicidarme"). A new subject or a subordinate clause ends
+  the negation's reach ("I don't sleep I want to die", "no sé si quiero
+  morir"), and so does another verb for a match that starts with one of its
+  own ("no duermo nada quiero morir");
+- someone else is its subject: a third-party noun comes right before it or
+  is tied to it by a copula ("my patient's suicide", "mi paciente es
+  suicida", but not "lost a patient today, want to die");
+- it is professional talk ("suicide risk assessment", "prevención del suicidio",
+  but not "I'm at risk of suicide").
+
+    python -m utils.safety          # latency benchmark
+"""
+import argparse
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+RISK_PHRASES: Dict[str, Set[str]] = {
+    "en": {
+        "suicide",
+        "suicidal",
+        "kill myself",
+        "killing myself",
+        "end my life",
+        "ending my life",
+        "take my own life",
+        "taking my own life",
+        "want to die",
+        "wanna die",
+        "wish i was dead",
+        "wish i were dead",
+        "better off dead",
+        "better off without me",
+        "don't want to live",
+        "no longer want to live",
+        "don't want to be alive",
+        "don't want to be here anymore",
+        "no reason to live",
+        "nothing to live for",
+        "not worth living",
+        "end it all",
+        "can't go on",
+        "hurt myself",
+        "hurting myself",
+        "harm myself",
+        "harming myself",
+        "self harm",
+        "self-harm",
+        "cut myself",
+        "cutting myself",
+        "hang myself",
+        "shoot myself",
+        "overdose on purpose",
+        "take all my pills",
+    },
+    "es": {
+        "suicidio",
+        "suicida",
+        "suicidas",
+        "suicidarme",
+        "quiero matarme",
+        "voy a matarme",
+        "pienso en matarme",
+        "ganas de matarme",
+        "quitarme la vida",
+        "acabar con mi vida",
+        "terminar con mi vida",
+        "quiero morir",
+        "quiero morirme",
+        "me quiero morir",
+        "no quiero vivir",
+        "no quiero seguir viviendo",
+        "no tengo razones para vivir",
+        "no vale la pena vivir",
+        "mejor muerto",
+        "mejor muerta",
+        "mejor sin mí",
+        "acabar con todo",
+        "ya no puedo más",
+        "hacerme daño",
+        "lastimarme",
+        "cortarme",
+        "autolesión",
+        "autolesionarme",
+        "tomarme todas las pastillas",
+    },
+}
+
+# Spellings of the same contraction. Phrases are written with the first one and
+# matched under all of them, and negation cues also match without the apostrophe.
+CONTRACTIONS: List[Tuple[str, ...]] = [
+    ("don't", "dont", "do not"),
+    ("can't", "cant", "cannot", "can not"),
+]
+
+NEGATION_CUES: Set[str] = {
+    "not",
+    "never",
+    "no",
+    "don't",
+    "didn't",
+    "doesn't",
+    "wouldn't",
+    "won't",
+    "nor",
+    "without",
+    "nunca",
+    "jamás",
+    "tampoco",
+    "ni",
+    "sin",
+}
+
+# A new subject or a subordinate clause ends the reach of a negation.
+FIRST_PERSON_CUES: Set[str] = {"i", "i'm", "i've", "i'd", "yo"}
+SUBORDINATOR_CUES: Set[str] = {"if", "that", "si", "que"}
+
+# Spanish drops the subject, so a match that starts with a finite verb may be
+# a clause of its own after another verb ("no puedo más quiero morir"). Such a
+# match is only negated right before it.
+FINITE_VERB_CUES: Set[str] = {"quiero", "voy", "pienso", "tengo", "puedo"}
+
+# Object pronouns that sit between a negation and its verb ("no me quiero morir").
+CLITIC_CUES: Set[str] = {"me", "te", "se"}
+
+# Nouns for someone other than the user. Pronouns and articles are left out on
+# purpose: "since his death I want to die" is still about the user, and
+# accent folding would turn "él" into the article "el".
+THIRD_PARTY_CUES: Set[str] = {
+    "patient",
+    "patient's",
+    "patients",
+    "patients'",
+    "colleague",
+    "colleague's",
+    "coworker",
+    "coworker's",
+    "friend",
+    "friend's",
+    "paciente",
+    "pacientes",
+    "colega",
+    "compañero",
+    "compañera",
+    "amigo",
+    "amiga",
+}
+
+# Links a third-party noun to a match that follows it ("coworker is suicidal").
+COPULA_CUES: Set[str] = {"is", "was", "are", "were", "es", "era", "fue", "está", "estaba", "son", "están"}
+
+# Clinical or training talk right after the match ("suicide risk assessment").
+PROFESSIONAL_CUES: Set[str] = {
+    "prevention",
+    "training",
+    "risk",
+    "screening",
+    "protocol",
+    "watch",
+    "hotline",
+    "assessment",
+    "precautions",
+    "prevención",
+    "capacitación",
+    "riesgo",
+    "protocolo",
+    "evaluación",
+}
+
+# The same talk with the topic noun first ("prevención del suicidio", "prevention of suicide").
+# "risk"/"riesgo" is left out: "I'm at risk of suicide" is about the user.
+PROFESSIONAL_PREFIX_CUES: Set[str] = {
+    "prevention",
+    "training",
+    "screening",
+    "protocol",
+    "assessment",
+    "prevención",
+    "capacitación",
+    "protocolo",
+    "evaluación",
+}
+
+CLAUSE_BREAKS: Set[str] = {".", ",", ";", ":", "!", "?", "but", "pero", "and", "y"}
+
+NEGATION_WINDOW = 3
+
+# Fold accents and curly apostrophes so "suicidarmé"/"don’t" match the lexicon.
+_FOLD = str.maketrans("áéíóúüñ’‘", "aeiouun''")
+_TOKEN = re.compile(r"[a-z0-9']+|[.,;:!?]")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower().translate(_FOLD))
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over token sequences."""
+
+    def __init__(self, phrases: Dict[str, str]) -> None:
+        # phrases: phrase text -> language
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, str]]] = [[]]
+        for phrase, lang in phrases.items():
+            self._add(_tokens(phrase), phrase, lang)
+        self._link()
+
+    def _add(self, tokens: List[str], phrase: str, lang: str) -> None:
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(tokens), phrase, lang))
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def matches(self, tokens: List[str]):
+        """Yield (start, end, phrase, lang) for every phrase occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for length, phrase, lang in out[node]:
+                yield i + 1 - length, i + 1, phrase, lang
+
+
+def _window_has(tokens: List[str], start: int, stop: int, step: int, cues: Set[str], size: int) -> bool:
+    """Look up to `size` tokens from `start` towards `stop`, staying in the clause."""
+    i = start
+    seen = 0
+    while i != stop and seen < size:
+        token = tokens[i]
+        if token in CLAUSE_BREAKS:
+            return False
+        if token in cues:
+            return True
+        i += step
+        seen += 1
+    return False
+
+
+_FOLDED_NEGATIONS = {cue.translate(_FOLD) for cue in NEGATION_CUES}
+_FOLDED_NEGATIONS |= {cue.replace("'", "") for cue in _FOLDED_NEGATIONS}
+_NEGATION_STOPS = CLAUSE_BREAKS | {cue.translate(_FOLD) for cue in FIRST_PERSON_CUES | SUBORDINATOR_CUES}
+_FOLDED_CLITICS = {cue.translate(_FOLD) for cue in CLITIC_CUES}
+_FOLDED_THIRD_PARTY = {cue.translate(_FOLD) for cue in THIRD_PARTY_CUES}
+_FOLDED_COPULAS = {cue.translate(_FOLD) for cue in COPULA_CUES}
+_FOLDED_PROFESSIONAL = {cue.translate(_FOLD) for cue in PROFESSIONAL_CUES}
+_FOLDED_PROFESSIONAL_PREFIX = {cue.translate(_FOLD) for cue in PROFESSIONAL_PREFIX_CUES}
+
+def _spellings(phrase: str) -> List[str]:
+    """The phrase under every spelling of the contractions in it."""
+    spellings = [phrase]
+    for forms in CONTRACTIONS:
+        pattern = re.compile(r"\b(?:%s)(?![\w'])" % "|".join(re.escape(form) for form in forms))
+        spellings = [pattern.sub(form, spelling) for spelling in spellings for form in forms]
+    return list(dict.fromkeys(spellings))
+
+
+_AUTOMATON = PhraseAutomaton({
+    spelling: lang
+    for lang, phrases in RISK_PHRASES.items()
+    for phrase in phrases
+    for spelling in _spellings(phrase)
+})
+
+
+def _opens_clause(phrase: str) -> bool:
+    """Whether a Spanish phrase starts with a finite verb, after any "me"/"no"/"ya"."""
+    for token in _tokens(phrase):
+        if token not in _FOLDED_CLITICS and token not in ("no", "ya"):
+            return token in FINITE_VERB_CUES
+    return False
+
+
+_CLAUSE_OPENERS = {phrase for phrase in RISK_PHRASES["es"] if _opens_clause(phrase)}
+
+
+def _negated(tokens: List[str], start: int, size: int) -> bool:
+    """Whether a negation cue comes up to `size` words before `start`, clitics aside, in its reach."""
+    i = start - 1
+    seen = 0
+    while i >= 0 and seen < size:
+        token = tokens[i]
+        if token in _NEGATION_STOPS:
+            return False
+        if token in _FOLDED_NEGATIONS:
+            return True
+        if token not in _FOLDED_CLITICS:
+            seen += 1
+        i -= 1
+    return False
+
+
+def _about_someone_else(tokens: List[str], start: int) -> bool:
+    """Whether the match at `start` is tied to a third-party noun, directly or by a copula."""
+    before = start - 1
+    if before >= 0 and tokens[before] in _FOLDED_COPULAS:
+        before -= 1
+    return before >= 0 and tokens[before] in _FOLDED_THIRD_PARTY
+
+
+def screen(text: str) -> Optional[Tuple[str, str]]:
+    """Return (phrase, lang) for the first self-directed risk phrase, else None."""
+    if not text:
+        return None
+    tokens = _tokens(text)
+    for start, end, phrase, lang in _AUTOMATON.matches(tokens):
+        if _negated(tokens, start, 1 if phrase in _CLAUSE_OPENERS else NEGATION_WINDOW):
+            continue
+        if _about_someone_else(tokens, start):
+            continue
+        if _window_has(tokens, end, len(tokens), 1, _FOLDED_PROFESSIONAL, 2):
+            continue
+        if _window_has(tokens, start - 1, -1, -1, _FOLDED_PROFESSIONAL_PREFIX, 2):
+            continue
+        return phrase, lang
+    return None
+
+
+def is_risky(text: str) -> bool:
+    return screen(text) is not None
+
+
+BENCHMARK_MESSAGES: List[str] = [
+    "Sometimes, a little.",
+    "Quite often, it bothers me a lot, especially after night shifts in the ICU.",
+    "Honestly pretty stressed and overwhelmed, I keep replaying the code we lost last week.",
+    "A veces, un poco, sobre todo cuando hay muchos pacientes en urgencias.",
+    "I'm not suicidal, just exhausted.",
+    "My patient's suicide still haunts me.",
+    "We had suicide prevention training last month.",
+    "Lately I just want to die, I can't go on like this.",
+    "Ya no quiero vivir así, estoy agotada.",
+    "Siempre, todos los días, no puedo dormir.",
+]
+
+
+def benchmark(iterations: int = 20000) -> Dict[str, float]:
+    """Time screen() against the lexical scorer it runs in front of."""
+    from utils.scoring import parse_score
+
+    messages = BENCHMARK_MESSAGES
+    total = iterations * len(messages)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for message in messages:
+            screen(message)
+    screen_us = 1e6 * (time.perf_counter() - started) / total
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for message in messages:
+            parse_score(message, "intrusion_1")
+    score_us = 1e6 * (time.perf_counter() - started) / total
+    return {"screen_us": screen_us, "parse_score_us": score_us}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the safety screener.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    for message in BENCHMARK_MESSAGES:
+        print(f"{str(screen(message)):<40} {message}")
+    result = benchmark(args.iterations)
+    print(f"screen: {result['screen_us']:.1f} us/message, parse_score: {result['parse_score_us']:.1f} us/message")
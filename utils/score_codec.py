@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List, Optional
+
+from utils.scoring import DOMAIN_ITEM_COUNTS
+
+
+# One character per scored item, in the order the flow asks them:
+# "0"-"4" for a score, UNSET if not answered yet, SKIPPED if adaptive mode skipped it.
+ITEM_ORDER: List[str] = [
+    f"{domain}_{i}"
+    for domain, count in DOMAIN_ITEM_COUNTS.items()
+    for i in range(1, count + 1)
+]
+
+UNSET = "-"
+SKIPPED = "x"
+
+EMPTY = UNSET * len(ITEM_ORDER)
+
+_INDEX: Dict[str, int] = {qid: i for i, qid in enumerate(ITEM_ORDER)}
+
+
+def _chars(packed: Optional[str]) -> List[str]:
+    if not packed or len(packed) != len(ITEM_ORDER):
+        return list(EMPTY)
+    return list(packed)
+
+
+def pack_scores(scores: Dict[str, Optional[float]], skipped: Iterable[str] = ()) -> str:
+    """Encode item scores (and skipped items) into the compact slot value."""
+    chars = list(EMPTY)
+    for qid in skipped:
+        chars[_INDEX[qid]] = SKIPPED
+    for qid, value in scores.items():
+        if value is not None and qid in _INDEX:
+            chars[_INDEX[qid]] = str(int(value))
+    return "".join(chars)
+
+
+def unpack_scores(packed: Optional[str]) -> Dict[str, Optional[int]]:
+    """Decode the compact slot value; unanswered and skipped items are None."""
+    return {
+        qid: int(ch) if ch.isdigit() else None
+        for qid, ch in zip(ITEM_ORDER, _chars(packed))
+    }
+
+
+def skipped_items(packed: Optional[str]) -> List[str]:
+    return [qid for qid, ch in zip(ITEM_ORDER, _chars(packed)) if ch == SKIPPED]
+
+
+def set_score(packed: Optional[str], question_id: str, score: float) -> str:
+    chars = _chars(packed)
+    chars[_INDEX[question_id]] = str(int(score))
+    return "".join(chars)
+
+
+def mark_skipped(packed: Optional[str], question_ids: Iterable[str]) -> str:
+    chars = _chars(packed)
+    for qid in question_ids:
+        chars[_INDEX[qid]] = SKIPPED
+    return "".join(chars)
+
+
+def domain_scores(packed: Optional[str], domain: str) -> List[int]:
+    """Item scores for one domain with unanswered and skipped items as 0."""
+    scores = unpack_scores(packed)
+    return [scores[f"{domain}_{i}"] or 0 for i in range(1, DOMAIN_ITEM_COUNTS[domain] + 1)]
@@ -1,5 +1,5 @@
 import re
-from typing import Dict, Iterable, List, Set
+from typing import Dict, Iterable, List, Optional, Set
 
 
 NOT_SURE_PATTERNS: Set[str] = {
@@ -177,6 +177,20 @@ TOPIC_KEYWORDS: Dict[str, Set[str]] = {
     },
 }
 
+# Coarse tone of the previous answer, used for the lead-in to the next question.
+TONE_STRESS_MARKERS: Set[str] = {"stressed", "overwhelmed", "anxious", "panic", "stress", "estres", "ansioso", "abrumado"}
+TONE_LOW_MARKERS: Set[str] = {"no", "nope", "not really", "none", "never", "not that much", "nada", "nunca", "no mucho", "para nada"}
+TONE_HIGH_MARKERS: Set[str] = {"very", "a lot", "often", "constantly", "mucho", "muy", "bastante", "siempre"}
+
+MAX_ITEM_SCORE = 4
+
+# Scored items per domain, in the order the flow asks them.
+DOMAIN_ITEM_COUNTS: Dict[str, int] = {
+    "intrusion": 5,
+    "avoidance": 2,
+    "hyperarousal": 6,
+}
+
 
 def _normalize(text: str) -> str:
     return re.sub(r"\s+", " ", (text or "").lower().strip())
@@ -206,6 +220,20 @@ def needs_followup(text: str) -> bool:
     return normalized in VAGUE_PATTERNS
 
 
+def answer_tone(text: str) -> str:
+    """Classify an answer as stress/high/low/neutral ("" for no answer)."""
+    low = (text or "").lower().strip()
+    if not low:
+        return ""
+    if _contains_any(low, TONE_STRESS_MARKERS):
+        return "stress"
+    if _contains_any(low, TONE_HIGH_MARKERS):
+        return "high"
+    if _contains_any(low, TONE_LOW_MARKERS):
+        return "low"
+    return "neutral"
+
+
 def _domain_from_question_id(question_id: str) -> str:
     if question_id.startswith("intrusion_"):
         return "intrusion"
@@ -216,8 +244,8 @@ def _domain_from_question_id(question_id: str) -> str:
     return "context"
 
 
-def parse_score(text: str, question_id: str = "") -> int:
-    """Infer a backend-only score from free text on a 0-4 scale."""
+def lexical_override(text: str) -> Optional[int]:
+    """Scores the lexical rules are sure of: 0 for no answer or explicit absence, 4 for STRONG markers."""
     normalized = _normalize(text)
     if not normalized:
         return 0
@@ -229,13 +257,23 @@ def parse_score(text: str, question_id: str = "") -> int:
     ):
         return 0
 
+    if _contains_any(normalized, STRONG_MARKERS):
+        return 4
+    return None
+
+
+def parse_score(text: str, question_id: str = "") -> int:
+    """Infer a backend-only score from free text on a 0-4 scale."""
+    override = lexical_override(text)
+    if override is not None:
+        return override
+    normalized = _normalize(text)
+
     level = 2  # neutral default for meaningful free text
     if _contains_any(normalized, MILD_MARKERS):
         level = max(level, 1)
     if _contains_any(normalized, HIGH_MARKERS):
         level = max(level, 3)
-    if _contains_any(normalized, STRONG_MARKERS):
-        level = 4
 
     domain = _domain_from_question_id(question_id)
     if domain in TOPIC_KEYWORDS and _contains_any(normalized, TOPIC_KEYWORDS[domain]):
@@ -244,8 +282,6 @@ def parse_score(text: str, question_id: str = "") -> int:
         # Escalate if intensifiers co-occur with topic content.
         if _contains_any(normalized, HIGH_MARKERS):
             level = max(level, 3)
-        if _contains_any(normalized, STRONG_MARKERS):
-            level = 4
 
     return max(0, min(4, level))
 
@@ -259,3 +295,19 @@ def get_top_domains(scores: dict) -> list:
     """Get top 2 domains by score."""
     sorted_domains = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     return [domain for domain, _ in sorted_domains[:2]]
+
+
+def scoring_backend() -> str:
+    """`lexical` or `exemplar`, from `scoring: backend` in config.yml."""
+    from utils.content_loader import load_question_config
+
+    return (load_question_config().get("scoring") or {}).get("backend", "lexical")
+
+
+def score_answer(text: str, question_id: str = "") -> int:
+    """Score with the configured backend; the exemplar scorer is imported only when selected."""
+    if scoring_backend() == "exemplar":
+        from utils.exemplar_scorer import get_scorer
+
+        return get_scorer().score(text, question_id)
+    return parse_score(text, question_id)
@@ -0,0 +1,379 @@
+"""In-process flow simulator.
+
+Interprets the `set_slots`, `action` and `collect` steps of data/flows.yml
+directly against the classes in `actions/`, with a fake tracker and a
+scripted user, so whole sessions run without a Rasa server or a trained
+model:
+
+    python -m utils.simulator --sessions 10000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Text
+
+import yaml
+from rasa_sdk import Action
+from rasa_sdk.executor import CollectingDispatcher
+
+import actions
+from utils.scoring import DOMAIN_ITEM_COUNTS
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+FLOWS_PATH = os.path.join(ROOT_DIR, 'data', 'flows.yml')
+DOMAIN_PATH = os.path.join(ROOT_DIR, 'domain.yml')
+
+# Scripted answers by language and intended 0-4 level.
+LEVEL_ANSWERS: Dict[str, Dict[int, List[str]]] = {
+    "en": {
+        0: ["No, never.", "Not really, none at all.", "Nothing like that, never happens."],
+        1: ["Sometimes, a little.", "Occasionally, just a bit.", "Slightly, now and then."],
+        2: ["It comes up after some hard shifts.", "I notice it when work gets heavy.", "It happens, depends on the week."],
+        3: ["Quite often, it bothers me a lot.", "Very often lately.", "Frequently, especially after nights."],
+        4: ["Always, every day.", "Constantly, I can't shake it.", "Extremely, it's all day."],
+    },
+    "es": {
+        0: ["No, nunca.", "Para nada, ninguna vez.", "Nada de eso, nunca."],
+        1: ["A veces, un poco.", "Ocasionalmente, algo.", "Ligeramente, de vez en cuando."],
+        2: ["Me pasa después de algunos turnos duros.", "Lo noto cuando el trabajo pesa.", "Depende de la semana, me pasa."],
+        3: ["Bastante, me afecta mucho.", "Muy seguido últimamente.", "Frecuentemente, sobre todo de noche."],
+        4: ["Siempre, todos los días.", "Constantemente, no puedo quitármelo.", "Extremadamente, todo el día."],
+    },
+}
+
+UNCERTAIN_ANSWERS: Dict[str, List[str]] = {
+    "en": ["Not sure.", "I don't know.", "idk"],
+    "es": ["No sé.", "Ni idea."],
+}
+
+VAGUE_ANSWERS: Dict[str, List[str]] = {
+    "en": ["ok", "fine", "meh"],
+    "es": ["bien", "igual", "normal"],
+}
+
+CONTEXT_ANSWERS: Dict[str, Dict[str, List[str]]] = {
+    "en": {
+        "context_1": ["Honestly pretty stressed and overwhelmed.", "Tired, but managing.", "Up and down lately."],
+        "context_2": ["I'm a nurse.", "I work as a physician.", "I'm a paramedic.", "Therapist in a team."],
+        "context_3": ["About 5 years.", "12 years now.", "2 yrs."],
+        "context_4": ["Hospital ICU, short staffing.", "Outpatient clinic, long days.", "Home health, a lot of driving."],
+    },
+    "es": {
+        "context_1": ["Me siento estresada y abrumada.", "Cansado, pero bien.", "Con altibajos."],
+        "context_2": ["Soy enfermera.", "Trabajo como médico.", "Soy técnico."],
+        "context_3": ["Unos 5 años.", "12 años.", "3 años."],
+        "context_4": ["Hospital, urgencias.", "Clínica ambulatoria.", "Residencia de mayores."],
+    },
+}
+
+OPENING_MESSAGES: Dict[str, List[str]] = {
+    "en": ["Hi", "Hello, English please"],
+    "es": ["Hola", "Hola, quiero hablar en español"],
+}
+
+_CONDITION = re.compile(r"^(not\s+)?slots\.(\w+)(?:\s*(==|!=)\s*(.+))?$")
+
+
+class SimTracker:
+    """Just enough of rasa_sdk.Tracker for the actions in this repo."""
+
+    def __init__(self, sender_id: Text, slots: Dict[Text, Any]) -> None:
+        self.sender_id = sender_id
+        self.slots = slots
+        self.latest_message: Dict[Text, Any] = {"text": ""}
+        self.events: List[Dict[Text, Any]] = []
+
+    def get_slot(self, key: Text) -> Any:
+        return self.slots.get(key)
+
+
+class ScriptedUser:
+    """Answers questions in one language from a hidden per-domain severity."""
+
+    def __init__(
+        self,
+        rng: random.Random,
+        uncertain_rate: float = 0.08,
+        vague_rate: float = 0.08,
+        end_choices: Optional[List[Text]] = None,
+    ) -> None:
+        self.rng = rng
+        self.lang = rng.choice(["en", "es"])
+        self.severity = {domain: rng.uniform(0, 4) for domain in DOMAIN_ITEM_COUNTS}
+        self.uncertain_rate = uncertain_rate
+        self.vague_rate = vague_rate
+        self.end_choices = end_choices or ["end"]
+
+    def opening(self) -> Text:
+        return self.rng.choice(OPENING_MESSAGES[self.lang])
+
+    def answer(self, slot_name: Text) -> Text:
+        if slot_name == "end_choice":
+            return self.rng.choice(self.end_choices)
+        question_id = slot_name[:-len("_text")] if slot_name.endswith("_text") else slot_name
+        if question_id in CONTEXT_ANSWERS[self.lang]:
+            return self.rng.choice(CONTEXT_ANSWERS[self.lang][question_id])
+        roll = self.rng.random()
+        if roll < self.uncertain_rate:
+            return self.rng.choice(UNCERTAIN_ANSWERS[self.lang])
+        if roll < self.uncertain_rate + self.vague_rate:
+            return self.rng.choice(VAGUE_ANSWERS[self.lang])
+        domain = question_id.rsplit("_", 1)[0]
+        level = round(self.rng.gauss(self.severity.get(domain, 2), 0.8))
+        return self.rng.choice(LEVEL_ANSWERS[self.lang][max(0, min(4, level))])
+
+
+def load_flow_steps(path: Text = FLOWS_PATH, flow_id: Optional[Text] = None) -> List[Dict[Text, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        flows = yaml.safe_load(f)["flows"]
+    flow_id = flow_id or next(iter(flows))
+    return flows[flow_id]["steps"]
+
+
+def load_initial_slots(path: Text = DOMAIN_PATH) -> Dict[Text, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        slots = yaml.safe_load(f).get("slots", {})
+    return {name: spec.get("initial_value") for name, spec in slots.items()}
+
+
+def load_actions() -> Dict[Text, Action]:
+    found = {}
+    for value in vars(actions).values():
+        if isinstance(value, type) and issubclass(value, Action) and value is not Action:
+            instance = value()
+            found[instance.name()] = instance
+    return found
+
+
+def evaluate_condition(condition: Text, slots: Dict[Text, Any]) -> bool:
+    """Evaluate the `slots.x`, `not slots.x` and `slots.x == value` conditions used in flows."""
+    match = _CONDITION.match(condition.strip())
+    if not match:
+        raise ValueError(f"Unsupported flow condition: {condition!r}")
+    negate, slot, operator, literal = match.groups()
+    value = slots.get(slot)
+    if operator:
+        expected = yaml.safe_load(literal)
+        result = value == expected if operator == "==" else value != expected
+    else:
+        result = bool(value)
+    return not result if negate else result
+
+
+class FlowSimulator:
+    """Runs one flow end to end, step by step, against the real actions."""
+
+    def __init__(self, steps: Optional[List[Dict[Text, Any]]] = None) -> None:
+        self.steps = steps if steps is not None else load_flow_steps()
+        self.step_ids = {step["id"]: i for i, step in enumerate(self.steps) if "id" in step}
+        self.initial_slots = load_initial_slots()
+        self.actions = load_actions()
+        self.report = new_report()
+
+    def _jump(self, target: Any) -> int:
+        if target == "END":
+            return len(self.steps)
+        if not isinstance(target, str) or target not in self.step_ids:
+            raise ValueError(f"Unsupported flow jump target: {target!r}")
+        return self.step_ids[target]
+
+    def _next_index(self, index: int, slots: Dict[Text, Any]) -> int:
+        branches = self.steps[index].get("next")
+        if branches is None:
+            return index + 1
+        if not isinstance(branches, list):
+            return self._jump(branches)
+        for branch in branches:
+            if "if" in branch:
+                if evaluate_condition(branch["if"], slots):
+                    return self._jump(branch["then"])
+            else:
+                return self._jump(branch["else"])
+        return index + 1
+
+    def _skips_ahead(self, index: int, slots: Dict[Text, Any]) -> bool:
+        """Whether a conditional `next` on this step would fire with the current slots."""
+        branches = self.steps[index].get("next")
+        if not isinstance(branches, list):
+            return False
+        return any("if" in branch and evaluate_condition(branch["if"], slots) for branch in branches)
+
+    def _apply(self, tracker: SimTracker, events: List[Dict[Text, Any]]) -> Optional[Text]:
+        """Apply returned events; returns the name of a requested follow-up action."""
+        followup = None
+        for event in events:
+            kind = event.get("event")
+            if kind == "slot":
+                tracker.slots[event["name"]] = event["value"]
+            elif kind == "restart":
+                tracker.slots = dict(self.initial_slots)
+            elif kind == "followup":
+                followup = event.get("name")
+        tracker.events.extend(events)
+        return followup
+
+    def _run_action(self, name: Text, tracker: SimTracker) -> Optional[Text]:
+        report = self.report
+        if name.startswith("utter_"):
+            report["messages"] += 1
+            return None
+        action = self.actions[name]
+        dispatcher = CollectingDispatcher()
+        start = time.perf_counter()
+        events = action.run(dispatcher, tracker, {}) or []
+        report["action_time"][name] += time.perf_counter() - start
+        report["action_calls"][name] += 1
+        report["messages"] += len(dispatcher.messages)
+        if name == "action_parse_score":
+            self._count_parse_outcome(tracker, events)
+        return self._apply(tracker, events)
+
+    def _count_parse_outcome(self, tracker: SimTracker, events: List[Dict[Text, Any]]) -> None:
+        if (tracker.get_slot("current_question") or "").startswith("context_"):
+            return
+        report = self.report
+        report["scored_answers"] += 1
+        if any(e.get("event") == "followup" for e in events):
+            report["rephrases"] += 1
+        elif any(e.get("event") == "slot" and e["name"] == "rephrase_count" and e["value"] == 1 for e in events):
+            report["followups"] += 1
+
+    def run_session(self, user: ScriptedUser, sender_id: Text = "sim") -> SimTracker:
+        tracker = SimTracker(sender_id, dict(self.initial_slots))
+        tracker.latest_message = {"text": user.opening()}
+        report = self.report
+        index = 0
+        last_collect = None
+        while index < len(self.steps):
+            step = self.steps[index]
+            if "set_slots" in step:
+                for assignment in step["set_slots"]:
+                    tracker.slots.update(assignment)
+            elif "collect" in step:
+                slot_name = step["collect"]
+                text = user.answer(slot_name)
+                tracker.slots[slot_name] = text
+                tracker.latest_message = {"text": text}
+                tracker.events.append({"event": "user", "text": text})
+                report["user_turns"] += 1
+                last_collect = index
+            elif "action" in step:
+                followup = self._run_action(step["action"], tracker)
+                if followup == "action_listen" and last_collect is not None:
+                    if self._skips_ahead(index, tracker.slots):
+                        # Rasa would follow this branch past the item being re-asked.
+                        report["stale_skips"] += 1
+                    # Re-open the last collect so the user answers the rephrased question.
+                    index = last_collect
+                    continue
+            index = self._next_index(index, tracker.slots)
+        self._record_outcome(tracker)
+        return tracker
+
+    def _record_outcome(self, tracker: SimTracker) -> None:
+        report = self.report
+        report["sessions"] += 1
+        for domain in DOMAIN_ITEM_COUNTS:
+            report["score_distribution"][f"{domain}={int(tracker.get_slot(f'{domain}_score') or 0)}"] += 1
+        report["top_domains"][" + ".join(tracker.get_slot("top_domains") or [])] += 1
+        report["skipped_items"] += (tracker.get_slot("item_scores") or "").count("x")
+
+
+def new_report() -> Dict[Text, Any]:
+    return {
+        "sessions": 0,
+        "user_turns": 0,
+        "messages": 0,
+        "scored_answers": 0,
+        "rephrases": 0,
+        "followups": 0,
+        "skipped_items": 0,
+        "stale_skips": 0,
+        "action_time": Counter(),
+        "action_calls": Counter(),
+        "score_distribution": Counter(),
+        "top_domains": Counter(),
+    }
+
+
+def merge_reports(reports: List[Dict[Text, Any]]) -> Dict[Text, Any]:
+    merged = new_report()
+    for report in reports:
+        for key, value in report.items():
+            merged[key] += value
+    return merged
+
+
+def simulate(sessions: int, seed: int = 0, user_factory: Optional[Callable[[random.Random], ScriptedUser]] = None) -> Dict[Text, Any]:
+    """Simulate `sessions` sessions in this process and return the report."""
+    rng = random.Random(seed)
+    user_factory = user_factory or ScriptedUser
+    simulator = FlowSimulator()
+    for i in range(sessions):
+        simulator.run_session(user_factory(rng), sender_id=f"sim-{seed}-{i}")
+    return simulator.report
+
+
+def _simulate_chunk(args: tuple) -> Dict[Text, Any]:
+    sessions, seed = args
+    return simulate(sessions, seed)
+
+
+def simulate_parallel(sessions: int, workers: int, seed: int = 0) -> Dict[Text, Any]:
+    """Split the sessions over worker processes and merge their reports."""
+    if workers <= 1:
+        return simulate(sessions, seed)
+    base, extra = divmod(sessions, workers)
+    chunks = [(base + (1 if i < extra else 0), seed + i) for i in range(workers)]
+    with multiprocessing.Pool(workers) as pool:
+        return merge_reports(pool.map(_simulate_chunk, chunks))
+
+
+def format_report(report: Dict[Text, Any], elapsed: float) -> Text:
+    sessions = report["sessions"] or 1
+    scored = report["scored_answers"] or 1
+    total_action_time = sum(report["action_time"].values()) or 1.0
+    lines = [
+        f"sessions: {report['sessions']} in {elapsed:.2f}s ({60 * report['sessions'] / elapsed:,.0f} sessions/min)",
+        f"user turns per session: {report['user_turns'] / sessions:.2f}",
+        f"bot messages per session: {report['messages'] / sessions:.2f}",
+        f"rephrase rate: {100 * report['rephrases'] / scored:.2f}% of scored answers",
+        f"follow-up rate: {100 * report['followups'] / scored:.2f}% of scored answers",
+        f"items skipped per session (adaptive): {report['skipped_items'] / sessions:.2f}",
+        f"rephrases that would jump past their item: {report['stale_skips']}",
+        "",
+        "action time share:",
+    ]
+    for name, spent in report["action_time"].most_common():
+        calls = report["action_calls"][name]
+        lines.append(
+            f"  {name:<28} {100 * spent / total_action_time:5.1f}%  "
+            f"{calls / sessions:5.2f} calls/session  {1e6 * spent / calls:7.1f} us/call"
+        )
+    lines += ["", "top domains:"]
+    for combo, count in report["top_domains"].most_common():
+        lines.append(f"  {combo:<28} {100 * count / sessions:5.1f}%")
+    lines += ["", "domain score distribution:"]
+    for domain, count in DOMAIN_ITEM_COUNTS.items():
+        histogram = [
+            f"{score}:{report['score_distribution'][f'{domain}={score}']}"
+            for score in range(count * 4 + 1)
+            if report["score_distribution"][f"{domain}={score}"]
+        ]
+        lines.append(f"  {domain}: {' '.join(histogram)}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate assessment sessions without a Rasa server.")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    result = simulate_parallel(args.sessions, args.workers, args.seed)
+    print(format_report(result, time.perf_counter() - started))
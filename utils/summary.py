@@ -0,0 +1,123 @@
+from typing import Any, List, Text
+
+from utils.score_codec import domain_scores, skipped_items
+
+
+def render_summary(tracker: Any) -> Text:
+    """Render the end-of-assessment summary from the tracker's slots.
+
+    Everything comes from the packed item scores and the calculated domain
+    slots, so the text is rebuilt on demand instead of stored in the tracker.
+    """
+    lang = tracker.get_slot("user_language")
+    if lang not in {"en", "es"}:
+        lang = "en"
+
+    role = tracker.get_slot("user_role") or "healthcare professional"
+    years = tracker.get_slot("user_experience_years") or "unspecified"
+    setting = tracker.get_slot("user_setting") or "current setting"
+
+    packed = tracker.get_slot("item_scores")
+    intrusion = domain_scores(packed, "intrusion")
+    avoidance = domain_scores(packed, "avoidance")
+    hyperarousal = domain_scores(packed, "hyperarousal")
+
+    intrusion_score = int(tracker.get_slot("intrusion_score") or 0)
+    avoidance_score = int(tracker.get_slot("avoidance_score") or 0)
+    hyperarousal_score = int(tracker.get_slot("hyperarousal_score") or 0)
+    top_domains = tracker.get_slot("top_domains") or []
+
+    item_labels = {
+        "en": {
+            "intrusion": ["sudden memories/images", "dreams", "reliving moments", "emotional waves", "physical distress from reminders"],
+            "avoidance": ["avoiding thoughts/feelings", "avoiding people/situations"],
+            "hyperarousal": ["always on guard", "easily startled", "concentration difficulty", "sleep disruption", "irritability/anger", "risk-taking behavior"],
+        },
+        "es": {
+            "intrusion": ["recuerdos/imágenes repentinas", "sueños", "revivir momentos", "oleadas emocionales", "malestar físico por recordatorios"],
+            "avoidance": ["evitar pensamientos/emociones", "evitar personas/situaciones"],
+            "hyperarousal": ["estar siempre en guardia", "sobresalto fácil", "dificultad para concentrarse", "problemas de sueño", "irritabilidad/enojo", "conductas de riesgo"],
+        },
+    }
+
+    skipped = set(skipped_items(packed))
+    skipped_word = "skipped" if lang == "en" else "omitido"
+
+    def top_items(values: List[int], labels: List[str]) -> List[str]:
+        indexed = sorted(enumerate(values), key=lambda x: x[1], reverse=True)
+        chosen = [f"{labels[i]} ({v}/4)" for i, v in indexed[:2] if v >= 2]
+        return chosen
+
+    def item_scores(domain_name: str, values: List[int]) -> str:
+        shown = [
+            skipped_word if f"{domain_name}_{i}" in skipped else str(v)
+            for i, v in enumerate(values, start=1)
+        ]
+        return f"[{', '.join(shown)}]"
+
+    def skipped_labels() -> List[str]:
+        return [
+            label
+            for domain_name, labels in item_labels[lang].items()
+            for i, label in enumerate(labels, start=1)
+            if f"{domain_name}_{i}" in skipped
+        ]
+
+    intr_top = top_items(intrusion, item_labels[lang]["intrusion"])
+    av_top = top_items(avoidance, item_labels[lang]["avoidance"])
+    hyp_top = top_items(hyperarousal, item_labels[lang]["hyperarousal"])
+
+    # Adaptive mode: call out items that were never asked.
+    skipped_en = skipped_es = ""
+    if skipped:
+        skipped_en = (
+            "- Skipped by adaptive mode (not asked; domain totals cover answered items only): "
+            f"{', '.join(skipped_labels())}\n"
+        )
+        skipped_es = (
+            "- Omitidas por el modo adaptativo (no preguntadas; los totales solo incluyen las respuestas dadas): "
+            f"{', '.join(skipped_labels())}\n"
+        )
+
+    if lang == "en":
+        summary = (
+            "For testing the chatbot purposes, here are the user's scores:\n"
+            f"- Background: role={role}, years_experience={years}, setting={setting}\n"
+            f"- Domain totals: Intrusion={intrusion_score}/20, Avoidance={avoidance_score}/8, Hyperarousal={hyperarousal_score}/24\n"
+            f"- Top two domains: {top_domains}\n"
+            f"- Intrusion item scores: {item_scores('intrusion', intrusion)}\n"
+            f"- Avoidance item scores: {item_scores('avoidance', avoidance)}\n"
+            f"- Hyperarousal item scores: {item_scores('hyperarousal', hyperarousal)}\n"
+            f"{skipped_en}\n"
+            "Focused guidance based on higher-scored areas:\n"
+            f"- Intrusion focus: {', '.join(intr_top) if intr_top else 'No strong intrusion hotspots identified.'}\n"
+            f"- Avoidance focus: {', '.join(av_top) if av_top else 'No strong avoidance hotspots identified.'}\n"
+            f"- Hyperarousal focus: {', '.join(hyp_top) if hyp_top else 'No strong hyperarousal hotspots identified.'}\n\n"
+            "Practical next steps:\n"
+            "- For high reactivity/startle or being on edge: use brief grounding (5-4-3-2-1) and paced breathing 2-3 times daily.\n"
+            "- For concentration/sleep strain: set one short decompression routine after shifts and reduce stimulation 60 minutes before bed.\n"
+            "- For lower-scored areas: keep protective habits (regular meals, hydration, movement, social support) to prevent escalation.\n"
+            "- Track changes weekly so you can see which domain is improving and where support is still needed."
+        )
+    else:
+        summary = (
+            "Para fines de prueba del chatbot, aquí están las puntuaciones del usuario:\n"
+            f"- Contexto: rol={role}, años_experiencia={years}, entorno={setting}\n"
+            f"- Totales por dominio: Intrusión={intrusion_score}/20, Evasión={avoidance_score}/8, Hiperactivación={hyperarousal_score}/24\n"
+            f"- Dos dominios principales: {top_domains}\n"
+            f"- Puntuaciones de intrusión: {item_scores('intrusion', intrusion)}\n"
+            f"- Puntuaciones de evasión: {item_scores('avoidance', avoidance)}\n"
+            f"- Puntuaciones de hiperactivación: {item_scores('hyperarousal', hyperarousal)}\n"
+            f"{skipped_es}\n"
+            "Guía enfocada según las áreas con mayor puntuación:\n"
+            f"- Enfoque en intrusión: {', '.join(intr_top) if intr_top else 'No se identificaron focos altos de intrusión.'}\n"
+            f"- Enfoque en evasión: {', '.join(av_top) if av_top else 'No se identificaron focos altos de evasión.'}\n"
+            f"- Enfoque en hiperactivación: {', '.join(hyp_top) if hyp_top else 'No se identificaron focos altos de hiperactivación.'}\n\n"
+            "Siguientes pasos prácticos:\n"
+            "- Para sobresalto/alerta constante: usa grounding breve (5-4-3-2-1) y respiración pausada 2-3 veces al día.\n"
+            "- Para concentración/sueño: implementa una rutina corta de descarga después del turno y baja estímulos 60 minutos antes de dormir.\n"
+            "- Para áreas con puntajes bajos: mantén hábitos protectores (comidas regulares, hidratación, movimiento, apoyo social).\n"
+            "- Revisa cambios semanalmente para ver qué dominio mejora y dónde aún necesitas apoyo."
+        )
+
+    return summary
@@ -0,0 +1,75 @@
+"""Memory-bounded in-memory tracker store.
+
+Configured from endpoints.yml:
+
+    tracker_store:
+      type: utils.tracker_store.BoundedInMemoryTrackerStore
+      max_conversations: 5000
+      max_bytes: 268435456
+      ttl_seconds: 86400
+"""
+import logging
+import sys
+from typing import Any, Dict, Iterable, Optional, Text
+
+from rasa.core.brokers.broker import EventBroker
+from rasa.core.tracker_stores.tracker_store import InMemoryTrackerStore
+from rasa.shared.core.domain import Domain
+from rasa.shared.core.trackers import DialogueStateTracker
+
+from utils.bounded_store import BoundedStore
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedInMemoryTrackerStore(InMemoryTrackerStore):
+    """InMemoryTrackerStore with a size cap, idle TTL and LRU eviction.
+
+    Finished conversations (`end_choice == "end"`) are evicted before any
+    conversation that may still continue. Counters and the memory gauge are
+    available from `stats()` and logged every `log_every` saves.
+    """
+
+    def __init__(
+        self,
+        domain: Domain,
+        event_broker: Optional[EventBroker] = None,
+        max_conversations: Optional[int] = 10000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = 24 * 60 * 60,
+        log_every: int = 1000,
+        **kwargs: Dict[Text, Any],
+    ) -> None:
+        super().__init__(domain, event_broker, **kwargs)
+        self.store = BoundedStore(
+            max_entries=max_conversations,
+            max_bytes=max_bytes,
+            ttl_s=ttl_seconds,
+        )
+        self.log_every = log_every
+
+    async def save(self, tracker: DialogueStateTracker) -> None:
+        """Updates and saves the current conversation state."""
+        await self.stream_events(tracker)
+        serialised = self.serialise_tracker(tracker)
+        self.store.put(
+            tracker.sender_id,
+            serialised,
+            size=sys.getsizeof(serialised),
+            evict_early=tracker.get_slot("end_choice") == "end",
+        )
+        if self.log_every and self.store.counters["puts"] % self.log_every == 0:
+            logger.info(f"Tracker store stats: {self.stats()}")
+
+    async def delete(self, sender_id: Text) -> None:
+        """Delete tracker for the given sender_id."""
+        if not self.store.delete(sender_id):
+            logger.debug(f"Could not find tracker for conversation ID '{sender_id}'.")
+
+    async def keys(self) -> Iterable[Text]:
+        """Returns sender_ids of the conversations still held in memory."""
+        return self.store.keys()
+
+    def stats(self) -> Dict[Text, Any]:
+        """Counters plus the current memory usage in bytes."""
+        return self.store.stats()
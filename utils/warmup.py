@@ -0,0 +1,55 @@
+"""Startup warm-up for the action server.
+
+Loads every content file, builds the matchers (and the exemplar indexes
+when that backend is on) and plays one synthetic session per language
+through the real actions, so the first users after a deploy do not pay for
+YAML parsing, regex compilation or cold code paths.
+"""
+import logging
+import random
+import time
+from typing import Dict
+
+from utils.content_loader import load_message, load_question_config, load_questions, load_summary
+from utils.safety import screen
+from utils.scoring import scoring_backend
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ("en", "es")
+
+
+def warm_up() -> Dict[str, float]:
+    """Prime caches and code paths; returns seconds spent per stage."""
+    from utils.simulator import FlowSimulator, ScriptedUser
+
+    timings: Dict[str, float] = {}
+
+    started = time.perf_counter()
+    config = load_question_config()
+    first_question = next(iter(config["questions"]))
+    for lang in LANGUAGES:
+        load_questions(lang, first_question, 0)
+        load_summary(lang)
+        load_message(lang, "busy")
+    timings["content"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    screen("warm-up")
+    if scoring_backend() == "exemplar":
+        from utils.exemplar_scorer import get_scorer
+
+        get_scorer().score("warm-up", "intrusion_1")
+    timings["matchers"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    simulator = FlowSimulator()
+    rng = random.Random(0)
+    for lang in LANGUAGES:
+        user = ScriptedUser(rng, end_choices=["summary"])
+        user.lang = lang
+        simulator.run_session(user, sender_id=f"warmup-{lang}")
+    timings["sessions"] = time.perf_counter() - started
+
+    logger.info(f"Warm-up finished: {timings}")
+    return timings